@@ -1,10 +1,8 @@
 from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form
-from fastapi.responses import JSONResponse
-from sqlalchemy.orm import Session
+from fastapi.responses import ORJSONResponse, Response
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
-import uuid
-import os
-from datetime import datetime
+import orjson
 
 from app.config.database import get_db
 from app.api.camera.schemas import (
@@ -12,14 +10,37 @@ from app.api.camera.schemas import (
     CameraSessionResponse, 
     CameraSessionDetailResponse,
     UploadedImageResponse,
-    ImageCaptureRequest
+    SESSION_LIST_ADAPTER
 )
 from app.services.camera_service import CameraSessionService
 from app.services.upload_service import ImageUploadService
 from app.core.security import get_current_user
 from app.utils.device_utils import detect_device_type
 
-router = APIRouter(tags=["Camera Sessions"])
+router = APIRouter(tags=["Camera Sessions"], default_response_class=ORJSONResponse)
+
+# 디바이스 타입별 카메라 권장 설정 (모듈 로드 시 미리 직렬화)
+_RECOMMENDATIONS = {
+    "mobile": {
+        "camera_resolution": "1280x720",
+        "quality": "medium",
+        "auto_focus": True
+    },
+    "tablet": {
+        "camera_resolution": "1920x1080", 
+        "quality": "high",
+        "auto_focus": True
+    },
+    "web": {
+        "camera_resolution": "1920x1080",
+        "quality": "high", 
+        "auto_focus": False
+    }
+}
+_RECOMMENDATIONS_JSON = {
+    device_type: orjson.dumps(recommendation)
+    for device_type, recommendation in _RECOMMENDATIONS.items()
+}
 
 @router.post(
     "/session", 
@@ -47,7 +68,7 @@ router = APIRouter(tags=["Camera Sessions"])
 async def create_camera_session(
     session_data: CameraSessionCreate,
     current_user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """새로운 카메라 세션 생성"""
     try:
@@ -84,9 +105,14 @@ async def create_camera_session(
 async def get_camera_session(
     session_id: str,
     current_user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
-    """카메라 세션 상세 정보 조회"""
+    """카메라 세션 상세 정보 조회
+
+    응답의 images 는 CameraSessionService.get_session 에서 selectinload 로
+    미리 로딩되어야 합니다. AsyncSession 에서는 지연 로딩이 불가능하고,
+    가능하더라도 이미지 수만큼 쿼리가 발생(N+1)하므로 제거하지 마세요.
+    """
     try:
         session_service = CameraSessionService(db)
         session = await session_service.get_session(session_id, current_user["id"])
@@ -141,7 +167,7 @@ async def capture_image(
     device_info: Optional[str] = Form(None, description="디바이스 정보 (JSON 문자열)"),
     file: UploadFile = File(..., description="업로드할 이미지 파일"),
     current_user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """이미지 캡처/업로드 처리"""
     try:
@@ -193,7 +219,7 @@ async def get_user_sessions(
     skip: int = 0,
     limit: int = 10,
     current_user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """사용자의 카메라 세션 목록 조회"""
     try:
@@ -203,7 +229,8 @@ async def get_user_sessions(
             skip=skip,
             limit=limit
         )
-        return sessions
+        # 서비스에서 검증된 목록을 한 번만 직렬화 (Response 를 직접 반환하면 response_model 재검증을 건너뜀)
+        return Response(content=SESSION_LIST_ADAPTER.dump_json(sessions), media_type="application/json")
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -232,7 +259,7 @@ async def update_session_status(
     session_id: str,
     status: str,
     current_user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """카메라 세션 상태 업데이트"""
     try:
@@ -280,27 +307,12 @@ async def detect_device(user_agent: str = None):
     """요청 헤더를 기반으로 디바이스 타입 감지"""
     try:
         device_type = detect_device_type(user_agent)
-        return {
-            "device_type": device_type,
-            "user_agent": user_agent,
-            "recommendations": {
-                "mobile": {
-                    "camera_resolution": "1280x720",
-                    "quality": "medium",
-                    "auto_focus": True
-                },
-                "tablet": {
-                    "camera_resolution": "1920x1080", 
-                    "quality": "high",
-                    "auto_focus": True
-                },
-                "web": {
-                    "camera_resolution": "1920x1080",
-                    "quality": "high", 
-                    "auto_focus": False
-                }
-            }.get(device_type, {})
-        }
+        payload = b'{"device_type":%s,"user_agent":%s,"recommendations":%s}' % (
+            orjson.dumps(device_type),
+            orjson.dumps(user_agent),
+            _RECOMMENDATIONS_JSON.get(device_type, b"{}")
+        )
+        return Response(content=payload, media_type="application/json")
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
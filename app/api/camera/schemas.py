@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter
 from typing import Optional, List
 from datetime import datetime
 
@@ -16,6 +16,8 @@ class ImageCaptureRequest(BaseModel):
 
 # 응답 스키마
 class CameraSessionResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+    
     id: int
     user_id: int
     session_id: str
@@ -23,11 +25,11 @@ class CameraSessionResponse(BaseModel):
     status: str
     created_at: datetime
     updated_at: datetime
-    
-    class Config:
-        from_attributes = True
+    image_count: int = 0
 
 class UploadedImageResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+    
     id: int
     session_id: int
     user_id: int
@@ -41,13 +43,14 @@ class UploadedImageResponse(BaseModel):
     processing_status: str
     uploaded_at: datetime
     processed_at: Optional[datetime]
-    
-    class Config:
-        from_attributes = True
 
 class CameraSessionDetailResponse(CameraSessionResponse):
     images: List[UploadedImageResponse] = []
 
+# 목록 응답용 검증기/직렬화기 (스키마는 모듈 로드 시 한 번만 빌드)
+SESSION_LIST_ADAPTER = TypeAdapter(List[CameraSessionResponse])
+IMAGE_LIST_ADAPTER = TypeAdapter(List[UploadedImageResponse])
+
 # WebSocket 메시지 스키마
 class FaceDetectionMessage(BaseModel):
     type: str = "face_detection"
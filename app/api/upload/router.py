@@ -1,18 +1,19 @@
 from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form, Query
-from fastapi.responses import FileResponse
-from sqlalchemy.orm import Session
+from fastapi.responses import FileResponse, ORJSONResponse, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
 import os
 from pathlib import Path
 
 from app.config.database import get_db
 from app.config.settings import settings
-from app.api.camera.schemas import UploadedImageResponse
+from app.api.camera.schemas import UploadedImageResponse, IMAGE_LIST_ADAPTER
 from app.services.upload_service import ImageUploadService
 from app.core.security import get_current_user
 from app.models.camera import UploadedImage
 
-router = APIRouter()
+router = APIRouter(default_response_class=ORJSONResponse)
 
 @router.post("/image", response_model=UploadedImageResponse)
 async def upload_image(
@@ -21,7 +22,7 @@ async def upload_image(
     device_type: str = Form(default="web", description="web, mobile, tablet"),
     file: UploadFile = File(...),
     current_user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """이미지 파일 업로드"""
     try:
@@ -51,20 +52,25 @@ async def get_user_images(
     limit: int = Query(10, ge=1, le=100),
     session_id: Optional[int] = Query(None),
     current_user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """사용자의 업로드된 이미지 목록 조회"""
     try:
-        query = db.query(UploadedImage).filter(
+        query = select(UploadedImage).where(
             UploadedImage.user_id == current_user["id"]
         )
         
         if session_id:
-            query = query.filter(UploadedImage.session_id == session_id)
+            query = query.where(UploadedImage.session_id == session_id)
         
-        images = query.order_by(UploadedImage.uploaded_at.desc()).offset(skip).limit(limit).all()
+        result = await db.execute(
+            query.order_by(UploadedImage.uploaded_at.desc()).offset(skip).limit(limit)
+        )
+        images = result.scalars().all()
         
-        return [UploadedImageResponse.from_orm(img) for img in images]
+        # ORM 행을 한 번만 검증/직렬화 (Response 를 직접 반환하면 response_model 재검증을 건너뜀)
+        payload = IMAGE_LIST_ADAPTER.dump_json(IMAGE_LIST_ADAPTER.validate_python(images, from_attributes=True))
+        return Response(content=payload, media_type="application/json")
         
     except Exception as e:
         raise HTTPException(
@@ -77,40 +83,48 @@ async def get_image_file(
     image_id: int,
     thumbnail: bool = Query(False),
     current_user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """이미지 파일 다운로드"""
     try:
-        # 이미지 소유권 확인
-        image = db.query(UploadedImage).filter(
-            UploadedImage.id == image_id,
-            UploadedImage.user_id == current_user["id"]
-        ).first()
+        # 이미지 소유권 확인 (메타데이터 캐시 우선)
+        upload_service = ImageUploadService(db)
+        image_meta = await upload_service.get_image_meta(image_id, current_user["id"])
         
-        if not image:
+        if not image_meta:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Image not found"
             )
         
-        # 파일 경로 구성
-        if thumbnail:
-            file_dir = os.path.dirname(os.path.join(settings.UPLOAD_DIR, image.file_path))
-            filename = f"thumb_{os.path.basename(image.file_path)}"
+        relative_path, thumbnail_path, mime_type, original_filename = image_meta
+        
+        # 파일 경로 구성 (썸네일 경로는 업로드 시 저장된 값 사용)
+        if thumbnail and thumbnail_path:
+            file_path = os.path.join(settings.UPLOAD_DIR, thumbnail_path)
+        elif thumbnail:
+            # thumbnail_path 컬럼 추가 이전에 업로드된 이미지
+            file_dir = os.path.dirname(os.path.join(settings.UPLOAD_DIR, relative_path))
+            filename = f"thumb_{os.path.basename(relative_path)}"
             file_path = os.path.join(file_dir, filename)
         else:
-            file_path = os.path.join(settings.UPLOAD_DIR, image.file_path)
+            file_path = os.path.join(settings.UPLOAD_DIR, relative_path)
         
-        if not os.path.exists(file_path):
+        # 존재 확인과 FileResponse 의 stat 을 한 번으로 처리
+        try:
+            stat_result = os.stat(file_path)
+        except FileNotFoundError:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="File not found"
             )
         
+        # FileResponse 는 Starlette 내부에서 sendfile 로 전송
         return FileResponse(
             path=file_path,
-            media_type=image.mime_type,
-            filename=image.original_filename
+            media_type=mime_type,
+            filename=original_filename,
+            stat_result=stat_result
         )
         
     except HTTPException:
@@ -125,7 +139,7 @@ async def get_image_file(
 async def delete_image(
     image_id: int,
     current_user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """이미지 삭제"""
     try:
@@ -1,28 +1,39 @@
-from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+import os
 from app.config.settings import settings
 
-# MySQL 데이터베이스 엔진 생성
-engine = create_engine(
-    settings.DATABASE_URL,
+# 커넥션 풀 크기
+# uvicorn 워커마다 별도의 풀을 가지므로, 서버 전체 커넥션 수가 CPU 수에 비례하도록
+# 워커 수로 나눠서 설정 (UVICORN_WORKERS 가 실제 워커 수와 같다고 가정)
+POOL_SIZE = max(5, (os.cpu_count() or 4) * 2 // max(settings.UVICORN_WORKERS, 1))
+
+# MySQL 비동기 데이터베이스 엔진 생성 (pymysql URL 은 asyncmy 드라이버로 변환)
+# 체크아웃마다 SELECT 1 을 보내는 pool_pre_ping 대신, MySQL wait_timeout
+# (기본 8시간)보다 충분히 짧은 pool_recycle 로 끊긴 커넥션을 회피
+engine = create_async_engine(
+    settings.DATABASE_URL.replace("pymysql", "asyncmy"),
     echo=settings.DEBUG,  # SQL 쿼리 로깅
-    pool_size=10,
-    max_overflow=20,
-    pool_recycle=3600,
-    pool_pre_ping=True
+    pool_size=POOL_SIZE,
+    max_overflow=POOL_SIZE * 2,
+    pool_recycle=1800,
+    pool_pre_ping=False,
+    # 모델의 타임스탬프를 DB 의 NOW() 로 생성하므로 기존과 같이 UTC 로 기록되도록 설정
+    connect_args={"init_command": "SET time_zone = '+00:00'"}
 )
 
 # 세션 팩토리 생성
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+SessionLocal = async_sessionmaker(
+    bind=engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False
+)
 
 # Base 클래스 생성
 Base = declarative_base()
 
 # 데이터베이스 세션 의존성
-def get_db():
-    db = SessionLocal()
-    try:
+async def get_db():
+    async with SessionLocal() as db:
         yield db
-    finally:
-        db.close()
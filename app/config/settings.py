@@ -1,4 +1,6 @@
+from pydantic import AliasChoices, Field
 from pydantic_settings import BaseSettings
+from functools import cached_property, lru_cache
 from typing import List, Union
 
 class Settings(BaseSettings):
@@ -12,6 +14,8 @@ class Settings(BaseSettings):
     # File Storage
     UPLOAD_DIR: str = "./uploads"
     MAX_FILE_SIZE: int = 10485760  # 10MB
+    # 이미지 후처리 프로세스 수 (0 이면 CPU 코어 수를 uvicorn 워커 수로 나눈 값)
+    IMAGE_PROCESS_WORKERS: int = 0
     
     # CORS - Union으로 문자열 또는 리스트 허용
     ALLOWED_ORIGINS: Union[str, List[str]] = "http://localhost:3000,http://localhost:5173,http://localhost:8080,http://localhost:8081"
@@ -20,14 +24,30 @@ class Settings(BaseSettings):
     HOST: str = "0.0.0.0"
     PORT: int = 8000
     DEBUG: bool = True
+    # uvicorn 워커 프로세스 수 (WEB_CONCURRENCY 환경 변수도 허용)
+    # WebSocket 연결/카운트다운 상태가 프로세스 메모리에 있으므로 여러 워커로 늘리려면
+    # 같은 세션의 연결이 같은 워커로 가도록 라우팅하거나 외부 pub/sub 이 필요함
+    UVICORN_WORKERS: int = Field(
+        default=1,
+        validation_alias=AliasChoices("UVICORN_WORKERS", "WEB_CONCURRENCY")
+    )
     
     # Camera Settings
     FACE_DETECTION_CONFIDENCE: float = 0.5
     COUNTDOWN_SECONDS: int = 3
+    FACE_DETECTION_DOWNSCALE: bool = True  # 감지 전 프레임 축소 여부
+    FACE_DETECTION_WORKERS: int = Field(2, ge=1)  # 얼굴 감지 스레드 수 (스레드마다 MediaPipe 인스턴스 생성)
     
-    @property
+    # WebSocket (uvicorn 프로토콜 설정)
+    # 최대 프레임 크기: 카메라 프레임 한 장에 충분한 크기로 제한해 연결당 수신 버퍼가 커지지 않도록 함
+    WS_MAX_SIZE: int = 4 * 1024 * 1024  # 4MB (uvicorn 기본값 16MB)
+    WS_PING_INTERVAL: float = 30.0  # 프로토콜 레벨 ping 간격 (초)
+    # permessage-deflate 압축 협상 (JSON 메시지 대역폭 절감, 연결마다 압축 컨텍스트 메모리 사용)
+    WS_PER_MESSAGE_DEFLATE: bool = True
+    
+    @cached_property
     def cors_origins(self) -> List[str]:
-        """CORS origins를 리스트로 반환"""
+        """CORS origins를 리스트로 반환 (최초 1회만 파싱)"""
         if isinstance(self.ALLOWED_ORIGINS, str):
             return [origin.strip() for origin in self.ALLOWED_ORIGINS.split(",")]
         return self.ALLOWED_ORIGINS
@@ -35,4 +55,9 @@ class Settings(BaseSettings):
     class Config:
         env_file = ".env"
 
-settings = Settings()
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """설정 싱글톤 반환 (.env 파싱은 최초 1회만 수행)"""
+    return Settings()
+
+settings = get_settings()
@@ -0,0 +1,103 @@
+import asyncio
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Any, Callable, List, Optional
+
+class AsyncBatcher:
+    """개별 요청을 큐에 모았다가 마이크로 배치로 묶어서 처리하는 배처"""
+    def __init__(
+        self,
+        process_batch: Callable[[List[Any]], List[Any]],
+        max_batch: int = 8,
+        max_wait_ms: float = 15,
+        executor: Optional[Executor] = None,
+        concurrency: int = 1
+    ):
+        # 입력 리스트를 받아 같은 순서의 결과 리스트를 반환하는 동기 함수
+        self.process_batch = process_batch
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        # 동시에 처리하는 배치 수 (executor 워커 수와 맞춤)
+        self.concurrency = concurrency
+        self.executor = executor or ThreadPoolExecutor(max_workers=concurrency)
+        self.queue: Optional[asyncio.Queue] = None
+        self.slots: Optional[asyncio.Semaphore] = None
+        self.worker: Optional[asyncio.Task] = None
+        # 처리 중인 배치 태스크 (GC 로 사라지지 않도록 참조 유지)
+        self.pending = set()
+
+    def close(self):
+        """워커 태스크 취소 및 executor 종료"""
+        if self.worker is not None:
+            self.worker.cancel()
+            self.worker = None
+        self.executor.shutdown(wait=False)
+
+    async def submit(self, item: Any) -> Any:
+        """항목을 큐에 넣고 배치 처리 결과를 기다림"""
+        # 워커는 실행 중인 이벤트 루프에서 처음 요청이 들어올 때 시작
+        if self.worker is None or self.worker.done():
+            self.queue = asyncio.Queue()
+            self.slots = asyncio.Semaphore(self.concurrency)
+            self.worker = asyncio.create_task(self._run())
+
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((item, future))
+        return await future
+
+    async def _collect(self) -> list:
+        """첫 항목을 기다린 뒤 max_batch 개 또는 max_wait 까지 추가 항목 수집"""
+        loop = asyncio.get_running_loop()
+        batch = [await self.queue.get()]
+        deadline = loop.time() + self.max_wait
+
+        while len(batch) < self.max_batch:
+            try:
+                batch.append(self.queue.get_nowait())
+                continue
+            except asyncio.QueueEmpty:
+                pass
+
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+
+            try:
+                batch.append(await asyncio.wait_for(self.queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+
+        return batch
+
+    async def _run(self):
+        """큐를 비우면서 배치 단위로 처리하는 백그라운드 루프"""
+        while True:
+            # 처리 슬롯이 빌 때까지 기다리는 동안 들어온 요청은 다음 배치에 모임
+            await self.slots.acquire()
+            try:
+                batch = await self._collect()
+            except BaseException:
+                self.slots.release()
+                raise
+            task = asyncio.create_task(self._dispatch(batch))
+            self.pending.add(task)
+            task.add_done_callback(self.pending.discard)
+
+    async def _dispatch(self, batch: list):
+        """배치 하나를 executor 에서 처리하고 결과 전달"""
+        loop = asyncio.get_running_loop()
+        items = [item for item, _ in batch]
+
+        try:
+            results = await loop.run_in_executor(self.executor, self.process_batch, items)
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        finally:
+            self.slots.release()
+
+        for (_, future), result in zip(batch, results):
+            # 대기 중에 연결이 끊겨 취소된 요청은 건너뜀
+            if not future.done():
+                future.set_result(result)
@@ -0,0 +1,38 @@
+import logging
+import queue
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional
+
+# 로그 출력 포맷
+LOG_FORMAT = "%(asctime)s %(levelname)s [%(name)s] %(message)s"
+
+# 백그라운드 스레드에서 실제 출력(stderr 쓰기)을 수행하는 리스너
+_listener: Optional[QueueListener] = None
+
+def start_logging(app_level: int = logging.INFO):
+    """루트 로거를 QueueHandler 로 설정 (이벤트 루프 스레드는 큐에 넣기만 하고 I/O 는 리스너 스레드가 수행)
+
+    서드파티 로거는 INFO, 이 애플리케이션(app.*) 로거만 app_level 적용
+    """
+    global _listener
+    if _listener is not None:
+        return
+
+    log_queue = queue.SimpleQueue()
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+
+    root = logging.getLogger()
+    root.addHandler(QueueHandler(log_queue))
+    root.setLevel(logging.INFO)
+    logging.getLogger("app").setLevel(app_level)
+
+    _listener = QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    _listener.start()
+
+def stop_logging():
+    """큐에 남은 로그를 모두 출력하고 리스너 스레드 종료"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
@@ -1,18 +1,31 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from jose import JWTError, jwt
-from datetime import datetime
+import jwt
+from jwt import InvalidTokenError as JWTError
+from cachetools import TTLCache
 from typing import Optional, Dict, Any
+import hashlib
+import threading
+import time
 
 from app.config.settings import settings
 
 # JWT Bearer 토큰 스키마
 security = HTTPBearer()
 
+# 검증된 토큰 캐시 (원본 JWT 대신 blake2b 해시를 키로 저장)
+_TOKEN_CACHE: TTLCache = TTLCache(maxsize=4096, ttl=30)
+_TOKEN_CACHE_LOCK = threading.Lock()
+
+def _token_cache_key(token: str) -> bytes:
+    """토큰 캐시 키 생성"""
+    return hashlib.blake2b(token.encode(), digest_size=16).digest()
+
 class JWTHandler:
     def __init__(self):
         self.secret_key = settings.JWT_SECRET
         self.algorithm = settings.JWT_ALGORITHM
+        self._now = time.time
     
     def decode_token(self, token: str) -> Dict[str, Any]:
         """JWT 토큰 디코딩"""
@@ -32,6 +45,14 @@ class JWTHandler:
     
     def verify_token(self, token: str) -> Dict[str, Any]:
         """토큰 검증 및 사용자 정보 추출"""
+        # 캐시 확인 (만료 시간은 매번 다시 확인)
+        cache_key = _token_cache_key(token)
+        with _TOKEN_CACHE_LOCK:
+            cached = _TOKEN_CACHE.get(cache_key)
+        
+        if cached is not None and self._now() <= cached["exp"]:
+            return cached
+        
         payload = self.decode_token(token)
         
         # 토큰 만료 확인
@@ -43,7 +64,7 @@ class JWTHandler:
                 headers={"WWW-Authenticate": "Bearer"},
             )
         
-        if datetime.utcnow().timestamp() > exp:
+        if self._now() > exp:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Token expired",
@@ -61,12 +82,17 @@ class JWTHandler:
                 headers={"WWW-Authenticate": "Bearer"},
             )
         
-        return {
+        user_info = {
             "id": int(user_id),
             "email": email,
             "exp": exp,
             "payload": payload
         }
+        
+        with _TOKEN_CACHE_LOCK:
+            _TOKEN_CACHE[cache_key] = user_info
+        
+        return user_info
 
 # JWT 핸들러 인스턴스
 jwt_handler = JWTHandler()
@@ -0,0 +1,18 @@
+from fastapi.staticfiles import StaticFiles
+from starlette.responses import Response
+
+class CachedStaticFiles(StaticFiles):
+    """Cache-Control 헤더를 추가하는 정적 파일 마운트
+
+    ETag / Last-Modified 및 If-None-Match → 304 처리는 StaticFiles 가 이미 수행하므로
+    브라우저가 재검증 없이 재사용할 수 있도록 max-age 만 추가한다.
+    """
+    def __init__(self, *args, cache_control: str = "public, max-age=3600", **kwargs):
+        super().__init__(*args, **kwargs)
+        self.cache_control = cache_control
+
+    def file_response(self, *args, **kwargs) -> Response:
+        response = super().file_response(*args, **kwargs)
+        # 200 / 304 응답 모두에 적용
+        response.headers["Cache-Control"] = self.cache_control
+        return response
@@ -0,0 +1,219 @@
+import asyncio
+import errno
+import logging
+import os
+import platform
+import re
+import shutil
+import threading
+from typing import BinaryIO, List, Tuple
+
+# io_uring 바인딩 (선택적 의존성, Linux 전용)
+try:
+    import liburing
+except ImportError:
+    liburing = None
+
+logger = logging.getLogger(__name__)
+
+# 한 번에 읽어서 제출하는 청크 크기
+CHUNK_SIZE = 256 * 1024
+
+# io_uring 미사용 시 복사 버퍼 크기 (기본 64KB 대비 read/write 시스템 콜 수 감소)
+COPY_BUFFER_SIZE = 1 << 20
+
+# 한 번의 io_uring_submit 으로 묶어서 보내는 최대 SQE 수
+QUEUE_DEPTH = 32
+
+# IORING_OP_WRITE 가 도입된 커널 버전 (io_uring 자체는 5.1 이지만 WRITE 연산은 5.6 부터 지원)
+MIN_KERNEL_VERSION = (5, 6)
+
+# IORING_OP_UNLINKAT 이 도입된 커널 버전
+MIN_UNLINK_KERNEL_VERSION = (5, 11)
+
+def _is_uring_supported(min_version: tuple = MIN_KERNEL_VERSION) -> bool:
+    """io_uring 사용 가능 여부 확인 (Linux 5.6+ 및 바인딩 설치 필요)"""
+    if liburing is None or platform.system() != "Linux":
+        return False
+
+    match = re.match(r"(\d+)\.(\d+)", platform.release())
+    if not match:
+        return False
+
+    return (int(match.group(1)), int(match.group(2))) >= min_version
+
+URING_AVAILABLE = _is_uring_supported()
+URING_UNLINK_AVAILABLE = _is_uring_supported(MIN_UNLINK_KERNEL_VERSION)
+
+# 스레드별 io_uring 인스턴스 (파일마다 링을 만들고 해제하지 않도록 스레드 풀 스레드마다 한 번만 생성)
+# 링 fd 는 프로세스 종료 시 커널이 정리
+_local = threading.local()
+
+def _get_ring():
+    """현재 스레드의 (ring, cqes) 반환 (최초 호출 시 QUEUE_DEPTH 크기로 생성)"""
+    ring = getattr(_local, "ring", None)
+    if ring is None:
+        ring = (liburing.io_uring(), liburing.io_uring_cqes())
+        liburing.io_uring_queue_init(QUEUE_DEPTH, ring[0], 0)
+        _local.ring = ring
+    return ring
+
+def _discard_ring():
+    """수거하지 못한 CQE 가 남았을 수 있는 현재 스레드의 링 해제 (다음 호출 시 새로 생성)"""
+    ring = getattr(_local, "ring", None)
+    if ring is not None:
+        _local.ring = None
+        liburing.io_uring_queue_exit(ring[0])
+
+def _submit_and_wait(ring, cqes, count: int):
+    """제출 대기 중인 SQE 를 한 번에 제출하고 완료(CQE)를 모두 수거 (실패가 있으면 모두 수거한 뒤 OSError)"""
+    liburing.io_uring_submit(ring)
+
+    error = None
+    for _ in range(count):
+        liburing.io_uring_wait_cqe(ring, cqes)
+        cqe = cqes[0]
+        result = cqe.res
+        liburing.io_uring_cqe_seen(ring, cqe)
+
+        if result < 0 and error is None:
+            error = OSError(-result, os.strerror(-result))
+
+    if error is not None:
+        raise error
+
+def _submit_writes(ring, cqes, fd: int, pending: List[Tuple[bytes, int]]):
+    """(데이터, 오프셋) 청크 쓰기를 한 번에 제출하고 CQE 별로 쓴 바이트 수 검증
+
+    user_data 에 청크 인덱스를 담아 CQE 를 해당 청크와 대응시키고,
+    부분 쓰기면 남은 부분만 다시 제출 (진행이 없으면 OSError)
+    실패한 청크가 있어도 나머지 CQE 를 모두 수거한 뒤 예외를 올림 (진행 중인 쓰기가 해제된 버퍼를 참조하지 않도록)
+    """
+    while pending:
+        for index, (data, offset) in enumerate(pending):
+            sqe = liburing.io_uring_get_sqe(ring)
+            liburing.io_uring_prep_write(sqe, fd, data, len(data), offset)
+            sqe.user_data = index
+
+        liburing.io_uring_submit(ring)
+
+        remaining = []
+        error = None
+        for _ in range(len(pending)):
+            liburing.io_uring_wait_cqe(ring, cqes)
+            cqe = cqes[0]
+            result = cqe.res
+            index = cqe.user_data
+            liburing.io_uring_cqe_seen(ring, cqe)
+
+            data, offset = pending[index]
+            if result < 0:
+                error = error or OSError(-result, os.strerror(-result))
+            elif result == 0:
+                error = error or OSError(errno.EIO, f"Short write at offset {offset}: 0/{len(data)} bytes")
+            elif result < len(data):
+                remaining.append((data[result:], offset + result))
+
+        if error is not None:
+            raise error
+
+        pending = remaining
+
+def _write_with_uring(path: str, stream: BinaryIO) -> int:
+    """io_uring 으로 청크 쓰기 + fsync 를 배치 제출"""
+    ring, cqes = _get_ring()
+
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        offset = 0
+        # (데이터, 오프셋) 목록 (완료될 때까지 버퍼가 해제되지 않도록 참조 유지)
+        in_flight = []
+
+        while True:
+            chunk = stream.read(CHUNK_SIZE)
+
+            if chunk:
+                in_flight.append((chunk, offset))
+                offset += len(chunk)
+
+            if in_flight and (not chunk or len(in_flight) == QUEUE_DEPTH):
+                _submit_writes(ring, cqes, fd, in_flight)
+                in_flight = []
+
+            if not chunk:
+                break
+
+        # 마지막으로 fsync 제출
+        sqe = liburing.io_uring_get_sqe(ring)
+        liburing.io_uring_prep_fsync(sqe, fd, 0)
+        _submit_and_wait(ring, cqes, 1)
+
+        # 최종 크기 확인 (청크별 부분 쓰기는 _submit_writes 에서 이미 검증)
+        written = os.fstat(fd).st_size
+        if written != offset:
+            raise OSError(f"Short write: {written}/{offset} bytes")
+
+        return offset
+    except BaseException:
+        # 실패 시점의 제출 상태를 알 수 없으므로 링을 폐기하고 다음 호출에서 새로 생성
+        _discard_ring()
+        raise
+    finally:
+        os.close(fd)
+
+def _write_with_copy(path: str, stream: BinaryIO) -> int:
+    """기존 방식 (버퍼 복사)으로 파일 저장"""
+    with open(path, "wb") as buffer:
+        shutil.copyfileobj(stream, buffer, COPY_BUFFER_SIZE)
+        return buffer.tell()
+
+async def write_file(path: str, stream: BinaryIO) -> int:
+    """업로드 스트림을 디스크에 저장하고 기록한 바이트 수 반환"""
+    if URING_AVAILABLE:
+        return await asyncio.to_thread(_write_with_uring, path, stream)
+    return await asyncio.to_thread(_write_with_copy, path, stream)
+
+def _unlink_with_uring(paths: List[str]):
+    """io_uring 으로 여러 파일 삭제를 QUEUE_DEPTH 개씩 묶어서 제출 (없는 파일은 무시)"""
+    ring, cqes = _get_ring()
+    encoded_paths = [os.fsencode(path) for path in paths]
+
+    try:
+        for start in range(0, len(encoded_paths), QUEUE_DEPTH):
+            batch = encoded_paths[start:start + QUEUE_DEPTH]
+            for index, path in enumerate(batch):
+                sqe = liburing.io_uring_get_sqe(ring)
+                liburing.io_uring_prep_unlinkat(sqe, liburing.AT_FDCWD, path, 0)
+                sqe.user_data = index
+
+            liburing.io_uring_submit(ring)
+
+            for _ in batch:
+                liburing.io_uring_wait_cqe(ring, cqes)
+                cqe = cqes[0]
+                result = cqe.res
+                index = cqe.user_data
+                liburing.io_uring_cqe_seen(ring, cqe)
+
+                if result < 0 and -result != errno.ENOENT:
+                    logger.warning("Failed to unlink file %s: %s", os.fsdecode(batch[index]), os.strerror(-result))
+    except BaseException:
+        _discard_ring()
+        raise
+
+def _unlink_with_os(paths: List[str]):
+    """os.unlink 로 파일 삭제 (없는 파일은 무시)"""
+    for path in paths:
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.warning("Failed to unlink file %s: %s", path, e)
+
+async def unlink_files(paths: List[str]):
+    """여러 파일을 이벤트 루프 밖에서 한 번에 삭제"""
+    if URING_UNLINK_AVAILABLE:
+        await asyncio.to_thread(_unlink_with_uring, paths)
+    else:
+        await asyncio.to_thread(_unlink_with_os, paths)
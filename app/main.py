@@ -1,34 +1,25 @@
-from fastapi import FastAPI, Depends
+from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
+from fastapi.responses import ORJSONResponse, Response
+import logging
 import os
 from dotenv import load_dotenv
 
-from app.config.settings import settings
+from app.config.settings import get_settings
 from app.config.database import engine, Base
 from app.api.camera.router import router as camera_router
 from app.api.upload.router import router as upload_router
 from app.websocket.camera_ws import router as websocket_router
 from app.websocket.manager import start_cleanup_task
+from app.core.static_files import CachedStaticFiles
+from app.core.log_queue import start_logging, stop_logging
+from app.services.face_detection import FaceDetectionService
+from app.services.upload_service import shutdown_image_pool
 
 # 환경 변수 로드
 load_dotenv()
 
-from fastapi import FastAPI, Depends
-from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
-import os
-from dotenv import load_dotenv
-
-from app.config.settings import settings
-from app.config.database import engine, Base
-from app.api.camera.router import router as camera_router
-from app.api.upload.router import router as upload_router
-from app.websocket.camera_ws import router as websocket_router
-from app.websocket.manager import start_cleanup_task
-
-# 환경 변수 로드
-load_dotenv()
+settings = get_settings()
 
 # FastAPI 앱 생성
 app = FastAPI(
@@ -81,7 +72,8 @@ app = FastAPI(
         }
     ],
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    default_response_class=ORJSONResponse
 )
 
 # CORS 설정
@@ -98,34 +90,47 @@ os.makedirs(settings.UPLOAD_DIR, exist_ok=True)
 os.makedirs("static", exist_ok=True)
 
 # 정적 파일 서빙 (업로드된 이미지)
-app.mount("/uploads", StaticFiles(directory=settings.UPLOAD_DIR), name="uploads")
-app.mount("/static", StaticFiles(directory="static"), name="static")
+# ETag 재검증에 더해 Cache-Control 로 재다운로드/재검증 요청 자체를 줄임
+app.mount("/uploads", CachedStaticFiles(directory=settings.UPLOAD_DIR), name="uploads")
+app.mount("/static", CachedStaticFiles(directory="static"), name="static")
 
 # 데이터베이스 테이블 생성
 @app.on_event("startup")
 async def create_tables():
-    Base.metadata.create_all(bind=engine)
+    # 로그 출력은 백그라운드 스레드에서 수행 (연결/해제 로그가 이벤트 루프를 막지 않도록)
+    start_logging(logging.DEBUG if settings.DEBUG else logging.INFO)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    # 얼굴 감지 서비스 싱글톤 (MediaPipe 그래프를 한 번만 생성)
+    app.state.face_detector = FaceDetectionService()
+    await app.state.face_detector.warmup()
     # WebSocket 연결 정리 백그라운드 태스크 시작
     start_cleanup_task()
 
+@app.on_event("shutdown")
+async def release_resources():
+    app.state.face_detector.close()
+    shutdown_image_pool()
+    stop_logging()
+
 # 라우터 등록
 app.include_router(camera_router, prefix="/api/camera", tags=["camera"])
 app.include_router(upload_router, prefix="/api/upload", tags=["upload"])
 app.include_router(websocket_router, tags=["websocket"])
 
+# 고정 응답 본문 (헬스 체크 프로브마다 JSON 직렬화를 하지 않도록 미리 준비)
+_ROOT_BODY = b'{"message":"Skincare Camera Backend API","version":"1.0.0"}'
+_HEALTH_BODY = b'{"status":"healthy","service":"camera-backend"}'
+
 @app.get("/")
 async def root():
-    return {"message": "Skincare Camera Backend API", "version": "1.0.0"}
+    return Response(content=_ROOT_BODY, media_type="application/json")
 
 @app.get("/health")
 async def health_check():
-    return {"status": "healthy", "service": "camera-backend"}
+    return Response(content=_HEALTH_BODY, media_type="application/json")
 
 if __name__ == "__main__":
-    import uvicorn
-    uvicorn.run(
-        "app.main:app",
-        host=settings.HOST,
-        port=settings.PORT,
-        reload=settings.DEBUG
-    )
+    # 서버 실행 설정은 run.py 한 곳에서 관리
+    from run import main as run_server
+    run_server()
@@ -1,26 +1,51 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, Float
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, Float, Index
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
-from datetime import datetime
+from sqlalchemy.sql import func
 
 Base = declarative_base()
 
 class CameraSession(Base):
     __tablename__ = "camera_sessions"
+    __table_args__ = (
+        # 사용자별 활성 세션 조회 / 상태별 통계용
+        Index("ix_sessions_user_status_created", "user_id", "status", "created_at"),
+        # 사용자별 최신순 세션 목록 조회용
+        Index("ix_sessions_user_created", "user_id", "created_at"),
+    )
+    # DB 에서 생성되는 타임스탬프를 flush 시점에 읽어 둠 (expire_on_commit=False 이므로 커밋 후 refresh() 불필요)
+    # RETURNING 이 없는 MySQL 에서는 INSERT/UPDATE 직후 별도 SELECT 가 실행되므로 왕복 횟수는 refresh() 와 같음
+    __mapper_args__ = {"eager_defaults": True}
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     session_id = Column(String(255), unique=True, index=True, nullable=False)
     device_type = Column(String(50), nullable=False)  # 'web', 'mobile', 'tablet'
     status = Column(String(50), default="active")  # 'active', 'completed', 'failed'
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    # 타임스탬프는 DB 에서 생성 (커넥션 time_zone 이 UTC 로 설정되어 있음)
+    created_at = Column(DateTime, server_default=func.now())
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
     
     # 카메라 세션과 관련된 이미지들
-    images = relationship("UploadedImage", back_populates="session")
+    images = relationship(
+        "UploadedImage",
+        back_populates="session",
+        order_by="desc(UploadedImage.uploaded_at)"
+    )
 
 class UploadedImage(Base):
     __tablename__ = "uploaded_images"
+    __table_args__ = (
+        # 사용자+세션별 최신순 이미지 목록 조회용 (WHERE + ORDER BY 커버)
+        Index("ix_uimg_user_session_uploaded", "user_id", "session_id", "uploaded_at"),
+        # 세션 필터 없는 사용자별 최신순 목록 조회용 (위 인덱스는 session_id 가 중간에 있어 정렬에 쓸 수 없음)
+        Index("ix_uimg_user_uploaded", "user_id", "uploaded_at"),
+        # 세션 상세 조회 시 이미지 일괄 로딩(session_id IN ... ORDER BY uploaded_at)용
+        Index("ix_uimg_session_uploaded", "session_id", "uploaded_at"),
+        # 동일 내용 이미지 중복 확인용
+        Index("ix_uimg_content_hash", "content_hash"),
+    )
+    __mapper_args__ = {"eager_defaults": True}
     
     id = Column(Integer, primary_key=True, index=True)
     session_id = Column(Integer, ForeignKey("camera_sessions.id"), nullable=False)
@@ -31,6 +56,8 @@ class UploadedImage(Base):
     file_path = Column(String(500), nullable=False)
     file_size = Column(Integer, nullable=False)
     mime_type = Column(String(100), nullable=False)
+    thumbnail_path = Column(String(500))  # 업로드 시 생성된 썸네일 상대 경로
+    content_hash = Column(String(64))  # 업로드 원본 내용 SHA-256 (hex)
     
     # 이미지 메타데이터
     width = Column(Integer)
@@ -41,7 +68,7 @@ class UploadedImage(Base):
     processing_status = Column(String(50), default="uploaded")  # 'uploaded', 'processing', 'completed', 'failed'
     
     # 타임스탬프
-    uploaded_at = Column(DateTime, default=datetime.utcnow)
+    uploaded_at = Column(DateTime, server_default=func.now())
     processed_at = Column(DateTime)
     
     # 관계
@@ -1,14 +1,14 @@
-from sqlalchemy.orm import Session
-from sqlalchemy import desc
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import case, desc, func, select
+from sqlalchemy.orm import selectinload
 from typing import List, Optional
 import uuid
-from datetime import datetime
 
 from app.models.camera import CameraSession, UploadedImage
-from app.api.camera.schemas import CameraSessionResponse, CameraSessionDetailResponse, UploadedImageResponse
+from app.api.camera.schemas import CameraSessionResponse, CameraSessionDetailResponse, SESSION_LIST_ADAPTER
 
 class CameraSessionService:
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
         self.db = db
     
     async def create_session(self, user_id: int, device_type: str) -> CameraSessionResponse:
@@ -23,69 +23,84 @@ class CameraSessionService:
         )
         
         self.db.add(db_session)
-        self.db.commit()
-        self.db.refresh(db_session)
+        await self.db.commit()
         
-        return CameraSessionResponse.from_orm(db_session)
+        return CameraSessionResponse.model_validate(db_session)
     
     async def get_session(self, session_id: str, user_id: int) -> Optional[CameraSessionDetailResponse]:
         """카메라 세션 상세 정보 조회"""
-        db_session = self.db.query(CameraSession).filter(
-            CameraSession.session_id == session_id,
-            CameraSession.user_id == user_id
-        ).first()
+        # 관련 이미지들은 selectinload 로 한 번의 IN (...) 쿼리에 함께 로딩
+        result = await self.db.execute(
+            select(CameraSession).options(
+                selectinload(CameraSession.images)
+            ).where(
+                CameraSession.session_id == session_id,
+                CameraSession.user_id == user_id
+            )
+        )
+        db_session = result.scalars().first()
         
         if not db_session:
             return None
         
-        # 관련 이미지들도 함께 조회
-        images = self.db.query(UploadedImage).filter(
-            UploadedImage.session_id == db_session.id
-        ).order_by(desc(UploadedImage.uploaded_at)).all()
-        
-        # 응답 객체 생성
-        session_response = CameraSessionDetailResponse.from_orm(db_session)
-        session_response.images = [UploadedImageResponse.from_orm(img) for img in images]
+        db_session.image_count = len(db_session.images)
         
-        return session_response
+        return CameraSessionDetailResponse.model_validate(db_session)
     
     async def get_user_sessions(self, user_id: int, skip: int = 0, limit: int = 10) -> List[CameraSessionResponse]:
         """사용자의 카메라 세션 목록 조회"""
-        sessions = self.db.query(CameraSession).filter(
-            CameraSession.user_id == user_id
-        ).order_by(desc(CameraSession.created_at)).offset(skip).limit(limit).all()
+        # 세션별 이미지 수까지 하나의 GROUP BY 쿼리로 조회
+        result = await self.db.execute(
+            select(CameraSession, func.count(UploadedImage.id))
+            .outerjoin(UploadedImage, UploadedImage.session_id == CameraSession.id)
+            .where(CameraSession.user_id == user_id)
+            .group_by(CameraSession.id)
+            .order_by(desc(CameraSession.created_at))
+            .offset(skip)
+            .limit(limit)
+        )
+        
+        sessions = []
+        for session, image_count in result.all():
+            session.image_count = image_count
+            sessions.append(session)
         
-        return [CameraSessionResponse.from_orm(session) for session in sessions]
+        return SESSION_LIST_ADAPTER.validate_python(sessions, from_attributes=True)
     
     async def update_session_status(self, session_id: str, user_id: int, status: str) -> Optional[CameraSessionResponse]:
         """카메라 세션 상태 업데이트"""
-        db_session = self.db.query(CameraSession).filter(
-            CameraSession.session_id == session_id,
-            CameraSession.user_id == user_id
-        ).first()
+        result = await self.db.execute(
+            select(CameraSession).where(
+                CameraSession.session_id == session_id,
+                CameraSession.user_id == user_id
+            )
+        )
+        db_session = result.scalars().first()
         
         if not db_session:
             return None
         
+        # updated_at 은 UPDATE 시 DB 에서 NOW() 로 갱신됨
         db_session.status = status
-        db_session.updated_at = datetime.utcnow()
         
-        self.db.commit()
-        self.db.refresh(db_session)
+        await self.db.commit()
         
-        return CameraSessionResponse.from_orm(db_session)
+        return CameraSessionResponse.model_validate(db_session)
     
     async def get_active_session(self, user_id: int) -> Optional[CameraSessionResponse]:
         """사용자의 활성 세션 조회"""
-        active_session = self.db.query(CameraSession).filter(
-            CameraSession.user_id == user_id,
-            CameraSession.status == "active"
-        ).order_by(desc(CameraSession.created_at)).first()
+        result = await self.db.execute(
+            select(CameraSession).where(
+                CameraSession.user_id == user_id,
+                CameraSession.status == "active"
+            ).order_by(desc(CameraSession.created_at))
+        )
+        active_session = result.scalars().first()
         
         if not active_session:
             return None
         
-        return CameraSessionResponse.from_orm(active_session)
+        return CameraSessionResponse.model_validate(active_session)
     
     async def close_session(self, session_id: str, user_id: int) -> bool:
         """카메라 세션 종료"""
@@ -94,18 +109,20 @@ class CameraSessionService:
     
     async def get_session_statistics(self, user_id: int) -> dict:
         """사용자의 세션 통계 정보"""
-        total_sessions = self.db.query(CameraSession).filter(
-            CameraSession.user_id == user_id
-        ).count()
-        
-        completed_sessions = self.db.query(CameraSession).filter(
-            CameraSession.user_id == user_id,
-            CameraSession.status == "completed"
-        ).count()
-        
-        total_images = self.db.query(UploadedImage).filter(
-            UploadedImage.user_id == user_id
-        ).count()
+        # 세션 수 / 완료 세션 수 / 이미지 수를 한 번의 쿼리로 집계
+        total_images_subquery = (
+            select(func.count(UploadedImage.id))
+            .where(UploadedImage.user_id == user_id)
+            .scalar_subquery()
+        )
+        
+        total_sessions, completed_sessions, total_images = (await self.db.execute(
+            select(
+                func.count(CameraSession.id),
+                func.count(case((CameraSession.status == "completed", 1))),
+                total_images_subquery
+            ).where(CameraSession.user_id == user_id)
+        )).one()
         
         return {
             "total_sessions": total_sessions,
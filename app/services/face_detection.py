@@ -1,91 +1,222 @@
 import cv2
 import mediapipe as mp
+import msgspec
 import numpy as np
-from typing import Dict, List, Tuple, Optional
+from typing import Dict, List, Tuple, Optional, Union
+import asyncio
 import base64
-from io import BytesIO
-from PIL import Image
+import threading
+from starlette.requests import HTTPConnection
 
 from app.config.settings import settings
+from app.core.async_batcher import AsyncBatcher
+from app.utils.jpeg_codec import decode_jpeg_rgb
+
+# 감지 전 축소할 프레임 너비 (근거리 모델은 작은 입력으로도 충분)
+TARGET_W = 320
+
+# 워밍업용 검은 프레임 (감지 입력 크기)
+WARMUP_FRAME = np.zeros((240, TARGET_W, 3), dtype=np.uint8)
+
+# 워밍업 시 모든 워커 스레드가 점유될 때까지 기다리는 최대 시간 (초)
+WARMUP_TIMEOUT = 10
+
+class FaceBBox(msgspec.Struct):
+    """얼굴 경계 상자 (원본 이미지 기준 절대 좌표 + 상대 좌표)"""
+    x: int
+    y: int
+    width: int
+    height: int
+    x_rel: float
+    y_rel: float
+    width_rel: float
+    height_rel: float
+
+class FaceQuality(msgspec.Struct):
+    """얼굴 품질 평가 점수"""
+    overall_score: float
+    confidence_score: float
+    size_score: float
+    position_score: float
+    is_good_quality: bool
+
+class DetectedFace(msgspec.Struct):
+    """감지된 얼굴 (품질/피드백 계산은 Struct 로 처리하고, 결과 dict 에는 to_builtins 로 변환해서 담음)"""
+    confidence: float
+    bbox: FaceBBox
+    quality: FaceQuality
 
 class FaceDetectionService:
     def __init__(self):
         self.mp_face_detection = mp.solutions.face_detection
         self.mp_drawing = mp.solutions.drawing_utils
-        self.face_detection = self.mp_face_detection.FaceDetection(
-            model_selection=0,  # 0: 2m 이내, 1: 5m 이내
-            min_detection_confidence=settings.FACE_DETECTION_CONFIDENCE
-        )
+        # MediaPipe 그래프는 스레드 안전하지 않으므로 스레드마다 별도 인스턴스 사용
+        self._local = threading.local()
+        self._detectors = []
+        self._detectors_lock = threading.Lock()
         self.countdown_timer = settings.COUNTDOWN_SECONDS
+        # WebSocket 프레임을 모아서 한 번의 executor 호출로 처리 (워커 스레드별로 배치 병렬 처리)
+        self.batcher = AsyncBatcher(
+            self._detect_batch,
+            max_batch=8,
+            max_wait_ms=15,
+            concurrency=settings.FACE_DETECTION_WORKERS
+        )
+    
+    @property
+    def face_detection(self):
+        """현재 스레드 전용 MediaPipe 얼굴 감지기 (최초 사용 시 생성)"""
+        detector = getattr(self._local, "detector", None)
+        if detector is None:
+            detector = self.mp_face_detection.FaceDetection(
+                model_selection=0,  # 0: 2m 이내, 1: 5m 이내
+                min_detection_confidence=settings.FACE_DETECTION_CONFIDENCE
+            )
+            self._local.detector = detector
+            with self._detectors_lock:
+                self._detectors.append(detector)
+        return detector
+    
+    async def warmup(self):
+        """워커 스레드마다 MediaPipe 그래프를 미리 만들고 첫 추론을 수행 (첫 클라이언트 지연 방지)"""
+        workers = self.batcher.concurrency
+        if workers < 1:
+            return
+        
+        # 먼저 끝난 스레드가 다음 워밍업을 가져가지 않도록 모든 스레드가 점유될 때까지 대기
+        barrier = threading.Barrier(workers)
+        
+        def _warm():
+            self.detect_faces_rgb(WARMUP_FRAME)
+            try:
+                barrier.wait(timeout=WARMUP_TIMEOUT)
+            except threading.BrokenBarrierError:
+                pass
+        
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*(
+            loop.run_in_executor(self.batcher.executor, _warm) for _ in range(workers)
+        ))
+    
+    async def detect_faces_async(self, image_data: Union[str, bytes]) -> Dict:
+        """Base64 문자열 또는 원본 이미지 바이트에서 얼굴 감지 (다른 프레임과 배치로 묶어서 처리)"""
+        return await self.batcher.submit(image_data)
+    
+    def _detect_batch(self, images: List[Union[str, bytes]]) -> List[Dict]:
+        """배치 단위 얼굴 감지 (executor 스레드에서 실행)"""
+        decoded = []
+        for image_data in images:
+            try:
+                if isinstance(image_data, bytes):
+                    decoded.append(self._decode_rgb(image_data))
+                else:
+                    decoded.append(self._decode_base64_rgb(image_data))
+            except Exception as e:
+                decoded.append(e)
+        
+        return [
+            self._error_result(image) if isinstance(image, Exception) else self.detect_faces_rgb(image)
+            for image in decoded
+        ]
+    
+    def _decode_base64_rgb(self, image_data: str) -> np.ndarray:
+        """Base64 (data URL 포함) 문자열을 RGB ndarray 로 디코딩"""
+        _, sep, encoded = image_data.partition(',')
+        return self._decode_rgb(base64.b64decode(encoded if sep else image_data))
+    
+    def _decode_rgb(self, image_bytes: bytes) -> np.ndarray:
+        """인코딩된 이미지 바이트를 RGB ndarray 로 디코딩"""
+        # JPEG 프레임은 libjpeg-turbo 로 바로 RGB 디코딩 (설치된 경우)
+        rgb_image = decode_jpeg_rgb(image_bytes)
+        if rgb_image is not None:
+            return rgb_image
+        
+        # 중간 PIL 이미지 없이 바로 BGR 로 디코딩 후 MediaPipe 가 쓰는 RGB 로 한 번만 변환
+        image = cv2.imdecode(np.frombuffer(image_bytes, dtype=np.uint8), cv2.IMREAD_COLOR)
+        if image is None:
+            raise ValueError("Failed to decode image")
+        
+        return cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+    
+    def _error_result(self, error: Exception) -> Dict:
+        """디코딩/감지 실패 시 결과 (정상 결과와 같은 키 + error)"""
+        return {
+            "detected": False,
+            "confidence": 0.0,
+            "face_count": 0,
+            "faces": [],
+            "ready_for_capture": False,
+            "feedback": "얼굴 감지 중 오류가 발생했습니다",
+            "error": str(error)
+        }
     
     def detect_faces_from_base64(self, image_data: str) -> Dict:
         """Base64 이미지에서 얼굴 감지"""
         try:
-            # Base64 디코딩
-            image_bytes = base64.b64decode(image_data.split(',')[1] if ',' in image_data else image_data)
-            image = Image.open(BytesIO(image_bytes))
-            
-            # OpenCV 형식으로 변환
-            opencv_image = cv2.cvtColor(np.array(image), cv2.COLOR_RGB2BGR)
-            
-            return self.detect_faces(opencv_image)
-            
+            rgb_image = self._decode_base64_rgb(image_data)
         except Exception as e:
-            return {
-                "detected": False,
-                "confidence": 0.0,
-                "face_count": 0,
-                "faces": [],
-                "error": str(e)
-            }
+            return self._error_result(e)
+        
+        return self.detect_faces_rgb(rgb_image)
+    
+    def detect_faces_from_bytes(self, image_bytes: bytes) -> Dict:
+        """인코딩된 이미지 바이트 (JPEG 등)에서 얼굴 감지"""
+        try:
+            rgb_image = self._decode_rgb(image_bytes)
+        except Exception as e:
+            return self._error_result(e)
+        
+        return self.detect_faces_rgb(rgb_image)
     
     def detect_faces(self, image: np.ndarray) -> Dict:
-        """OpenCV 이미지에서 얼굴 감지"""
+        """OpenCV (BGR) 이미지에서 얼굴 감지"""
+        # RGB로 변환 (MediaPipe는 RGB 사용)
+        return self.detect_faces_rgb(cv2.cvtColor(image, cv2.COLOR_BGR2RGB))
+    
+    def detect_faces_rgb(self, rgb_image: np.ndarray) -> Dict:
+        """RGB 이미지에서 얼굴 감지"""
         try:
-            # RGB로 변환 (MediaPipe는 RGB 사용)
-            rgb_image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+            # 원본 크기 (상대 좌표를 절대 좌표로 변환할 때 사용)
+            h, w, _ = rgb_image.shape
+            
+            # 감지 비용은 픽셀 수에 비례하므로 작은 크기로 축소해서 감지
+            detect_image = rgb_image
+            if settings.FACE_DETECTION_DOWNSCALE and w > TARGET_W:
+                scale = TARGET_W / w
+                detect_image = cv2.resize(
+                    rgb_image, (TARGET_W, int(h * scale)), interpolation=cv2.INTER_AREA
+                )
             
             # 얼굴 감지 수행
-            results = self.face_detection.process(rgb_image)
+            results = self.face_detection.process(detect_image)
             
             detected_faces = []
             max_confidence = 0.0
             
             if results.detections:
+                # 모든 얼굴의 [xmin, ymin, width, height, score] 를 모아서 한 번에 계산
+                rows = []
                 for detection in results.detections:
-                    # 신뢰도 점수
-                    confidence = detection.score[0]
-                    max_confidence = max(max_confidence, confidence)
-                    
-                    # 경계 상자 좌표
                     bbox = detection.location_data.relative_bounding_box
-                    
-                    # 이미지 크기 기준으로 절대 좌표 계산
-                    h, w, _ = image.shape
-                    x = int(bbox.xmin * w)
-                    y = int(bbox.ymin * h)
-                    width = int(bbox.width * w)
-                    height = int(bbox.height * h)
-                    
-                    # 얼굴 크기 및 위치 품질 평가
-                    face_quality = self._evaluate_face_quality(
-                        bbox, confidence, w, h
-                    )
-                    
-                    detected_faces.append({
-                        "confidence": confidence,
-                        "bbox": {
-                            "x": x,
-                            "y": y,
-                            "width": width,
-                            "height": height,
-                            "x_rel": bbox.xmin,
-                            "y_rel": bbox.ymin,
-                            "width_rel": bbox.width,
-                            "height_rel": bbox.height
-                        },
-                        "quality": face_quality
-                    })
+                    rows.append((bbox.xmin, bbox.ymin, bbox.width, bbox.height, detection.score[0]))
+                boxes = np.array(rows, dtype=np.float64)
+                
+                max_confidence = float(boxes[:, 4].max())
+                
+                # 원본 이미지 크기 기준으로 절대 좌표 계산
+                abs_boxes = (boxes[:, :4] * (w, h, w, h)).astype(int)
+                
+                # 얼굴 크기 및 위치 품질 평가
+                qualities = self._evaluate_face_quality(boxes)
+                
+                for (x_rel, y_rel, width_rel, height_rel, confidence), (x, y, width, height), face_quality in zip(
+                    boxes.tolist(), abs_boxes.tolist(), qualities
+                ):
+                    detected_faces.append(DetectedFace(
+                        confidence,
+                        FaceBBox(x, y, width, height, x_rel, y_rel, width_rel, height_rel),
+                        face_quality
+                    ))
             
             # 얼굴 감지 결과 정리
             face_detected = len(detected_faces) > 0 and max_confidence >= settings.FACE_DETECTION_CONFIDENCE
@@ -94,62 +225,56 @@ class FaceDetectionService:
                 "detected": face_detected,
                 "confidence": max_confidence,
                 "face_count": len(detected_faces),
-                "faces": detected_faces,
+                # 결과 dict 는 orjson 으로 그대로 직렬화할 수 있어야 하므로 Struct 를 기본 타입으로 변환
+                "faces": msgspec.to_builtins(detected_faces),
                 "ready_for_capture": self._is_ready_for_capture(detected_faces),
                 "feedback": self._get_user_feedback(detected_faces)
             }
             
         except Exception as e:
-            return {
-                "detected": False,
-                "confidence": 0.0,
-                "face_count": 0,
-                "faces": [],
-                "ready_for_capture": False,
-                "feedback": "얼굴 감지 중 오류가 발생했습니다",
-                "error": str(e)
-            }
+            return self._error_result(e)
     
-    def _evaluate_face_quality(self, bbox, confidence: float, image_width: int, image_height: int) -> Dict:
-        """얼굴 품질 평가"""
+    def _evaluate_face_quality(self, boxes: np.ndarray) -> List[FaceQuality]:
+        """얼굴 품질 평가 (boxes: 얼굴별 [xmin, ymin, width, height, confidence] 상대 좌표 배열)"""
+        xmin, ymin, width, height, confidence = boxes.T
+        
         # 얼굴 크기 평가 (이미지 대비)
-        face_area = bbox.width * bbox.height
-        size_score = min(face_area * 10, 1.0)  # 10%가 최적
+        face_area = width * height
+        size_score = np.minimum(face_area * 10, 1.0)  # 10%가 최적
         
         # 중앙 위치 평가
-        center_x = bbox.xmin + bbox.width / 2
-        center_y = bbox.ymin + bbox.height / 2
+        center_x = xmin + width / 2
+        center_y = ymin + height / 2
         
         # 중앙에서의 거리 (0.5, 0.5가 중앙)
-        center_distance = ((center_x - 0.5) ** 2 + (center_y - 0.5) ** 2) ** 0.5
-        position_score = max(0, 1 - center_distance * 2)
+        center_distance = np.sqrt((center_x - 0.5) ** 2 + (center_y - 0.5) ** 2)
+        position_score = np.maximum(0, 1 - center_distance * 2)
         
         # 전체 품질 점수
         quality_score = (confidence * 0.4 + size_score * 0.3 + position_score * 0.3)
         
-        return {
-            "overall_score": quality_score,
-            "confidence_score": confidence,
-            "size_score": size_score,
-            "position_score": position_score,
-            "is_good_quality": quality_score >= 0.7
-        }
+        return [
+            FaceQuality(overall, conf, size, position, overall >= 0.7)
+            for overall, conf, size, position in zip(
+                quality_score.tolist(), confidence.tolist(), size_score.tolist(), position_score.tolist()
+            )
+        ]
     
-    def _is_ready_for_capture(self, faces: List[Dict]) -> bool:
+    def _is_ready_for_capture(self, faces: List[DetectedFace]) -> bool:
         """자동 촬영 준비 상태 확인"""
         if not faces:
             return False
         
         # 가장 좋은 품질의 얼굴 확인
-        best_face = max(faces, key=lambda f: f["quality"]["overall_score"])
+        best_face = max(faces, key=lambda f: f.quality.overall_score)
         
         return (
             len(faces) == 1 and  # 얼굴이 하나만 감지됨
-            best_face["confidence"] >= 0.7 and  # 높은 신뢰도
-            best_face["quality"]["is_good_quality"]  # 좋은 품질
+            best_face.confidence >= 0.7 and  # 높은 신뢰도
+            best_face.quality.is_good_quality  # 좋은 품질
         )
     
-    def _get_user_feedback(self, faces: List[Dict]) -> str:
+    def _get_user_feedback(self, faces: List[DetectedFace]) -> str:
         """사용자 피드백 메시지 생성"""
         if not faces:
             return "얼굴을 카메라 앞에 위치시켜 주세요"
@@ -157,21 +282,20 @@ class FaceDetectionService:
         if len(faces) > 1:
             return "한 명만 촬영해 주세요"
         
-        face = faces[0]
-        quality = face["quality"]
+        quality = faces[0].quality
         
-        if quality["confidence_score"] < 0.5:
+        if quality.confidence_score < 0.5:
             return "조명을 확인하고 얼굴을 더 명확하게 보여주세요"
         
-        if quality["size_score"] < 0.3:
+        if quality.size_score < 0.3:
             return "카메라에 더 가까이 오세요"
-        elif quality["size_score"] > 0.8:
+        elif quality.size_score > 0.8:
             return "카메라에서 조금 멀어져 주세요"
         
-        if quality["position_score"] < 0.5:
+        if quality.position_score < 0.5:
             return "얼굴을 화면 중앙에 위치시켜 주세요"
         
-        if quality["is_good_quality"]:
+        if quality.is_good_quality:
             return "좋습니다! 잠시 후 자동으로 촬영됩니다"
         
         return "자세를 조정해 주세요"
@@ -204,17 +328,14 @@ class FaceDetectionService:
         
         return annotated_image
     
-    def __del__(self):
-        """리소스 정리"""
-        if hasattr(self, 'face_detection'):
-            self.face_detection.close()
-
-# 전역 인스턴스 (메모리 효율성을 위해)
-face_detector = None
+    def close(self):
+        """리소스 정리 (앱 종료 시 호출)"""
+        self.batcher.close()
+        with self._detectors_lock:
+            for detector in self._detectors:
+                detector.close()
+            self._detectors.clear()
 
-def get_face_detector() -> FaceDetectionService:
-    """얼굴 감지 서비스 인스턴스 반환"""
-    global face_detector
-    if face_detector is None:
-        face_detector = FaceDetectionService()
-    return face_detector
+async def get_face_detector(connection: HTTPConnection) -> FaceDetectionService:
+    """얼굴 감지 서비스 인스턴스 반환 (앱 시작 시 app.state 에 생성된 싱글톤)"""
+    return connection.app.state.face_detector
@@ -1,5 +1,6 @@
 # 임시 더미 얼굴 인식 서비스 (의존성 문제 해결 전까지)
-from typing import Dict
+from typing import Dict, Union
+from starlette.requests import HTTPConnection
 
 class FaceDetectionService:
     def __init__(self):
@@ -11,14 +12,38 @@ class FaceDetectionService:
             "detected": True,
             "confidence": 0.8,
             "face_count": 1,
+            # 실제 서비스와 같은 키 구성 (400x400 프레임 중앙의 얼굴 기준)
             "faces": [{
                 "confidence": 0.8,
-                "bbox": {"x": 100, "y": 100, "width": 200, "height": 200},
-                "quality": {"overall_score": 0.8, "is_good_quality": True}
+                "bbox": {
+                    "x": 100, "y": 100, "width": 200, "height": 200,
+                    "x_rel": 0.25, "y_rel": 0.25, "width_rel": 0.5, "height_rel": 0.5
+                },
+                "quality": {
+                    "overall_score": 0.8,
+                    "confidence_score": 0.8,
+                    "size_score": 0.8,
+                    "position_score": 0.8,
+                    "is_good_quality": True
+                }
             }],
             "ready_for_capture": True,
             "feedback": "얼굴이 감지되었습니다 (더미 모드)"
         }
+    
+    def detect_faces_from_bytes(self, image_bytes: bytes) -> Dict:
+        """더미 얼굴 감지 (바이너리 프레임)"""
+        return self.detect_faces_from_base64("")
+    
+    async def detect_faces_async(self, image_data: Union[str, bytes]) -> Dict:
+        """더미 얼굴 감지 (비동기 인터페이스)"""
+        return self.detect_faces_from_base64(image_data)
+
+    async def warmup(self):
+        pass
+
+    def close(self):
+        pass
 
-def get_face_detector() -> FaceDetectionService:
-    return FaceDetectionService()
+async def get_face_detector(connection: HTTPConnection) -> FaceDetectionService:
+    return connection.app.state.face_detector
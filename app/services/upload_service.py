@@ -1,27 +1,124 @@
 from fastapi import UploadFile, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from cachetools import TTLCache
+from concurrent.futures import ProcessPoolExecutor
+import asyncio
+import hashlib
+import logging
+import multiprocessing
 import os
-import shutil
 from datetime import datetime
-from typing import Optional
+from typing import BinaryIO, Optional, Tuple
 
 from app.models.camera import UploadedImage
 from app.api.camera.schemas import UploadedImageResponse
 from app.config.settings import settings
+from app.core.uring_writer import unlink_files, write_file
 from app.utils.image_utils import (
     generate_unique_filename,
-    get_image_info,
-    resize_image,
-    create_thumbnail,
+    process_in_one,
     validate_image_file,
     get_mime_type,
-    sanitize_filename,
-    rotate_image_by_exif
+    sanitize_filename
 )
-from app.utils.device_utils import validate_file_for_device
+from app.utils.device_utils import ALLOWED_UPLOAD_TYPES, get_max_file_size
+
+logger = logging.getLogger(__name__)
+
+# 이미지 파일 메타데이터 캐시: (image_id, user_id) -> (file_path, thumbnail_path, mime_type, original_filename)
+# 캐시는 uvicorn 워커(프로세스)마다 따로 있어 다른 워커의 삭제는 무효화되지 않으므로,
+# 짧은 TTL 로 오래된 항목이 남는 시간을 제한 (삭제된 이미지의 파일은 이미 지워져 404 로 응답됨)
+_IMAGE_META_CACHE: TTLCache = TTLCache(maxsize=8192, ttl=30)
+
+# 동시에 처리하는 업로드 수 제한
+_UPLOAD_SEMAPHORE = asyncio.Semaphore(32)
+
+class _HashingReader:
+    """읽는 동안 내용 해시를 계산하고 최대 크기를 넘으면 중단하는 파일 래퍼"""
+    def __init__(self, stream: BinaryIO, max_size: int):
+        self.stream = stream
+        self.max_size = max_size
+        self.size = 0
+        # sha256 은 OpenSSL 구현(SHA 확장 명령어)을 사용하므로 청크 단위 update 도 빠름
+        self.hasher = hashlib.sha256()
+    
+    def read(self, size: int = -1) -> bytes:
+        chunk = self.stream.read(size)
+        self.size += len(chunk)
+        
+        if self.size > self.max_size:
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail="File too large"
+            )
+        
+        self.hasher.update(chunk)
+        return chunk
+    
+    def hexdigest(self) -> str:
+        return self.hasher.hexdigest()
+
+# 이미지 후처리용 프로세스 풀 (PIL 작업은 GIL 을 잡고 있으므로 코어별로 병렬 처리)
+_IMAGE_POOL: Optional[ProcessPoolExecutor] = None
+
+def _image_pool_size() -> int:
+    """이미지 후처리 프로세스 수 (uvicorn 워커마다 풀이 생기므로 기본값은 코어 수를 워커 수로 나눔)"""
+    if settings.IMAGE_PROCESS_WORKERS > 0:
+        return settings.IMAGE_PROCESS_WORKERS
+    return max(1, (os.cpu_count() or 1) // max(1, settings.UVICORN_WORKERS))
+
+def get_image_pool() -> ProcessPoolExecutor:
+    """이미지 후처리 프로세스 풀 반환 (최초 사용 시 생성)"""
+    global _IMAGE_POOL
+    if _IMAGE_POOL is None:
+        # 얼굴 감지/로그 스레드가 떠 있는 프로세스를 fork 하면 잠긴 락이 복제될 수 있으므로
+        # forkserver 로 워커 시작 (forkserver 가 없는 Windows 는 spawn)
+        start_method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+        _IMAGE_POOL = ProcessPoolExecutor(
+            max_workers=_image_pool_size(),
+            mp_context=multiprocessing.get_context(start_method)
+        )
+    return _IMAGE_POOL
+
+def shutdown_image_pool():
+    """이미지 후처리 프로세스 풀 종료 (앱 종료 시 호출)"""
+    global _IMAGE_POOL
+    if _IMAGE_POOL is not None:
+        _IMAGE_POOL.shutdown(wait=False, cancel_futures=True)
+        _IMAGE_POOL = None
+
+class InvalidImageError(ValueError):
+    """이미지로 열 수 없는 파일"""
+
+def _process_image_file(file_path: str, thumbnail_path: str) -> dict:
+    """이미지 후처리 (프로세스 풀 워커에서 실행되므로 모듈 수준 함수로 정의)"""
+    # 이미지 유효성 검증
+    if not validate_image_file(file_path):
+        raise InvalidImageError(file_path)
+    
+    # 이미지 정보 추출 + EXIF 기반 회전 + 리사이징 + 썸네일 생성 (한 번만 열고 디코딩)
+    image_info = process_in_one(file_path, file_path, thumbnail_path, max_size=(1920, 1080))
+    
+    # 시그니처는 맞지만 디코딩에 실패한 파일(손상/잘린 이미지)은 저장하지 않음
+    if "error" in image_info:
+        raise InvalidImageError(image_info["error"])
+    
+    # 파일 크기 재계산
+    file_size = os.path.getsize(file_path)
+    mime_type = get_mime_type(file_path)
+    
+    return {
+        "width": image_info.get("width"),
+        "height": image_info.get("height"),
+        "file_size": file_size,
+        "mime_type": mime_type,
+        "format": image_info.get("format"),
+        "has_thumbnail": os.path.exists(thumbnail_path)
+    }
 
 class ImageUploadService:
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
         self.db = db
         self.upload_dir = settings.UPLOAD_DIR
         self.max_file_size = settings.MAX_FILE_SIZE
@@ -35,18 +132,29 @@ class ImageUploadService:
         device_type: str = "web"
     ) -> UploadedImageResponse:
         """이미지 업로드 전체 프로세스"""
-        
-        # 1. 파일 유효성 검증
-        await self._validate_upload_file(file, device_type)
+        # 1. 파일 유효성 검증 (업로드 내용을 읽기 전에 수행)
+        max_size = min(self.max_file_size, get_max_file_size(device_type))
+        await self._validate_upload_file(file, device_type, max_size)
         
         # 2. 파일 저장 경로 생성
-        file_path, relative_path = await self._create_file_path(user_id, file.filename)
-        
-        # 3. 파일 저장
-        await self._save_file(file, file_path)
+        file_path, relative_path, thumbnail_path, thumbnail_relative_path = await self._create_file_path(
+            user_id, file.filename
+        )
         
-        # 4. 이미지 처리
-        image_info = await self._process_image(file_path)
+        # 대용량 업로드가 몰려도 디스크/메모리/CPU 를 과도하게 쓰지 않도록 저장 + 후처리 동시 실행 수 제한
+        # (DB 저장은 커넥션 풀이 따로 제한하므로 세마포어 밖에서 수행)
+        async with _UPLOAD_SEMAPHORE:
+            # 3. 파일 저장 (저장하면서 크기 검증 및 내용 해시 계산)
+            content_hash = await self._save_file(file, file_path, max_size)
+            
+            # 같은 세션에 같은 내용의 이미지가 이미 있으면 후처리/저장 없이 기존 이미지 반환
+            duplicate = await self._find_duplicate(session_id, user_id, content_hash)
+            if duplicate is not None:
+                await unlink_files([file_path])
+                return UploadedImageResponse.model_validate(duplicate)
+            
+            # 4. 이미지 처리
+            image_info = await self._process_image(file_path, thumbnail_path)
         
         # 5. 데이터베이스 저장
         db_image = await self._save_to_database(
@@ -58,26 +166,22 @@ class ImageUploadService:
             mime_type=image_info["mime_type"],
             width=image_info["width"],
             height=image_info["height"],
-            capture_method=capture_method
+            capture_method=capture_method,
+            # 썸네일 상대 경로 (조회/삭제 시 경로 계산을 피하기 위해 DB에 저장)
+            thumbnail_path=thumbnail_relative_path if image_info["has_thumbnail"] else None,
+            content_hash=content_hash
         )
         
-        return UploadedImageResponse.from_orm(db_image)
+        return UploadedImageResponse.model_validate(db_image)
     
-    async def _validate_upload_file(self, file: UploadFile, device_type: str):
-        """업로드 파일 유효성 검증"""
+    async def _validate_upload_file(self, file: UploadFile, device_type: str, max_size: int):
+        """업로드 파일 유효성 검증 (헤더 정보만 사용하며 내용은 읽지 않음)"""
         if not file:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="No file provided"
             )
         
-        # 파일 크기 체크 (메모리에서)
-        content = await file.read()
-        file_size = len(content)
-        
-        # 파일을 처음으로 되돌리기
-        await file.seek(0)
-        
         # MIME 타입 체크
         if not file.content_type or not file.content_type.startswith('image/'):
             raise HTTPException(
@@ -85,91 +189,92 @@ class ImageUploadService:
                 detail="File must be an image"
             )
         
-        # 디바이스별 파일 크기 및 타입 검증
-        if not validate_file_for_device(file_size, file.content_type, device_type):
+        # 디바이스별 파일 타입 검증
+        if file.content_type.lower() not in ALLOWED_UPLOAD_TYPES:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"File too large or invalid type for {device_type} device"
+                detail=f"Invalid file type for {device_type} device"
+            )
+        
+        # 크기를 이미 알고 있으면 한 바이트도 읽기 전에 거부
+        # (알 수 없으면 저장하면서 스트림 중에 검증)
+        if file.size is not None and file.size > max_size:
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail=f"File too large for {device_type} device"
             )
     
-    async def _create_file_path(self, user_id: int, filename: str) -> tuple[str, str]:
-        """파일 저장 경로 생성"""
+    async def _create_file_path(self, user_id: int, filename: str) -> Tuple[str, str, str, str]:
+        """파일 및 썸네일 저장 경로 생성 (전체 경로, 상대 경로, 썸네일 전체 경로, 썸네일 상대 경로)"""
         # 안전한 파일명 생성
         safe_filename = sanitize_filename(filename)
         unique_filename = generate_unique_filename(safe_filename)
+        thumbnail_filename = f"thumb_{unique_filename}"
         
-        # 사용자별 디렉토리 구조
-        user_dir = os.path.join(self.upload_dir, f"user_{user_id}")
-        date_dir = datetime.now().strftime("%Y/%m/%d")
-        full_dir = os.path.join(user_dir, date_dir)
+        # 사용자별/날짜별 디렉토리 구조 (DB에 저장할 상대 경로 기준)
+        relative_dir = os.path.join(f"user_{user_id}", datetime.now().strftime("%Y/%m/%d"))
+        full_dir = os.path.join(self.upload_dir, relative_dir)
         
         # 디렉토리 생성
         os.makedirs(full_dir, exist_ok=True)
         
-        # 전체 파일 경로
-        file_path = os.path.join(full_dir, unique_filename)
-        
-        # DB에 저장할 상대 경로
-        relative_path = os.path.join(f"user_{user_id}", date_dir, unique_filename)
-        
-        return file_path, relative_path
+        return (
+            os.path.join(full_dir, unique_filename),
+            os.path.join(relative_dir, unique_filename),
+            os.path.join(full_dir, thumbnail_filename),
+            os.path.join(relative_dir, thumbnail_filename)
+        )
     
-    async def _save_file(self, file: UploadFile, file_path: str):
-        """파일을 디스크에 저장"""
+    async def _save_file(self, file: UploadFile, file_path: str, max_size: int) -> str:
+        """파일을 디스크에 저장하고 내용 해시 반환 (max_size 초과 시 413)"""
+        reader = _HashingReader(file.file, max_size)
         try:
-            with open(file_path, "wb") as buffer:
-                shutil.copyfileobj(file.file, buffer)
+            await write_file(file_path, reader)
+        except HTTPException:
+            if os.path.exists(file_path):
+                os.remove(file_path)
+            raise
         except Exception as e:
+            if os.path.exists(file_path):
+                os.remove(file_path)
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail=f"Failed to save file: {str(e)}"
             )
+        
+        return reader.hexdigest()
     
-    async def _process_image(self, file_path: str) -> dict:
-        """이미지 후처리"""
+    async def _find_duplicate(self, session_id: int, user_id: int, content_hash: str) -> Optional[UploadedImage]:
+        """같은 사용자/세션에 같은 내용(SHA-256)으로 업로드된 이미지 조회 (ix_uimg_content_hash 사용)"""
+        result = await self.db.execute(
+            select(UploadedImage).where(
+                UploadedImage.content_hash == content_hash,
+                UploadedImage.user_id == user_id,
+                UploadedImage.session_id == session_id
+            ).limit(1)
+        )
+        return result.scalars().first()
+    
+    async def _process_image(self, file_path: str, thumbnail_path: str) -> dict:
+        """이미지 후처리 (CPU 작업이므로 프로세스 풀에서 병렬 실행)"""
+        loop = asyncio.get_running_loop()
         try:
-            # 이미지 유효성 검증
-            if not validate_image_file(file_path):
-                os.remove(file_path)  # 잘못된 파일 삭제
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail="Invalid image file"
-                )
-            
-            # 이미지 정보 추출
-            image_info = get_image_info(file_path)
-            
-            # EXIF 기반 이미지 회전
-            rotate_image_by_exif(file_path)
-            
-            # 이미지 리사이징 (큰 이미지인 경우)
-            resize_image(file_path, max_width=1920, max_height=1080)
-            
-            # 썸네일 생성
-            thumbnail_dir = os.path.dirname(file_path)
-            thumbnail_name = f"thumb_{os.path.basename(file_path)}"
-            thumbnail_path = os.path.join(thumbnail_dir, thumbnail_name)
-            create_thumbnail(file_path, thumbnail_path)
-            
-            # 파일 크기 재계산
-            file_size = os.path.getsize(file_path)
-            mime_type = get_mime_type(file_path)
+            return await loop.run_in_executor(get_image_pool(), _process_image_file, file_path, thumbnail_path)
             
-            return {
-                "width": image_info.get("width"),
-                "height": image_info.get("height"),
-                "file_size": file_size,
-                "mime_type": mime_type,
-                "format": image_info.get("format"),
-                "has_thumbnail": os.path.exists(thumbnail_path)
-            }
-            
-        except HTTPException:
-            raise
+        except InvalidImageError:
+            # 잘못된 파일 삭제 (처리 도중 실패했으면 썸네일도 남아 있을 수 있음)
+            for path in (file_path, thumbnail_path):
+                if os.path.exists(path):
+                    os.remove(path)
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid image file"
+            )
         except Exception as e:
-            # 오류 발생 시 파일 삭제
-            if os.path.exists(file_path):
-                os.remove(file_path)
+            # 오류 발생 시 파일 삭제 (썸네일 저장 도중 실패했으면 썸네일도 남아 있을 수 있음)
+            for path in (file_path, thumbnail_path):
+                if os.path.exists(path):
+                    os.remove(path)
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail=f"Image processing failed: {str(e)}"
@@ -185,7 +290,9 @@ class ImageUploadService:
         mime_type: str,
         width: Optional[int],
         height: Optional[int],
-        capture_method: str
+        capture_method: str,
+        thumbnail_path: Optional[str] = None,
+        content_hash: Optional[str] = None
     ) -> UploadedImage:
         """데이터베이스에 이미지 정보 저장"""
         try:
@@ -199,58 +306,96 @@ class ImageUploadService:
                 width=width,
                 height=height,
                 capture_method=capture_method,
+                thumbnail_path=thumbnail_path,
+                content_hash=content_hash,
                 processing_status="completed"
             )
             
             self.db.add(db_image)
-            self.db.commit()
-            self.db.refresh(db_image)
+            await self.db.commit()
             
             return db_image
             
         except Exception as e:
-            self.db.rollback()
-            # DB 저장 실패 시 파일 삭제
-            full_file_path = os.path.join(self.upload_dir, file_path)
-            if os.path.exists(full_file_path):
-                os.remove(full_file_path)
+            await self.db.rollback()
+            # DB 저장 실패 시 파일 삭제 (원본 + 썸네일)
+            for path in (file_path, thumbnail_path):
+                full_path = os.path.join(self.upload_dir, path) if path else None
+                if full_path and os.path.exists(full_path):
+                    os.remove(full_path)
             
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail=f"Database save failed: {str(e)}"
             )
     
+    async def get_image_meta(self, image_id: int, user_id: int) -> Optional[Tuple[str, Optional[str], str, str]]:
+        """이미지 파일 메타데이터 조회 (소유권 확인 포함, 캐시 우선)"""
+        cache_key = (image_id, user_id)
+        image_meta = _IMAGE_META_CACHE.get(cache_key)
+        
+        if image_meta is None:
+            result = await self.db.execute(
+                select(
+                    UploadedImage.file_path,
+                    UploadedImage.thumbnail_path,
+                    UploadedImage.mime_type,
+                    UploadedImage.original_filename
+                ).where(
+                    UploadedImage.id == image_id,
+                    UploadedImage.user_id == user_id
+                )
+            )
+            row = result.first()
+            
+            if row is None:
+                return None
+            
+            image_meta = tuple(row)
+            _IMAGE_META_CACHE[cache_key] = image_meta
+        
+        return image_meta
+    
     async def delete_image(self, image_id: int, user_id: int) -> bool:
         """이미지 삭제"""
-        db_image = self.db.query(UploadedImage).filter(
+        image_filter = (
             UploadedImage.id == image_id,
             UploadedImage.user_id == user_id
-        ).first()
-        
-        if not db_image:
-            return False
+        )
         
         try:
-            # 파일 삭제
-            full_file_path = os.path.join(self.upload_dir, db_image.file_path)
-            if os.path.exists(full_file_path):
-                os.remove(full_file_path)
-            
-            # 썸네일 삭제
-            thumbnail_path = os.path.join(
-                os.path.dirname(full_file_path),
-                f"thumb_{os.path.basename(full_file_path)}"
+            # 삭제할 파일 경로만 조회한 뒤 같은 트랜잭션에서 행 삭제
+            result = await self.db.execute(
+                select(UploadedImage.file_path, UploadedImage.thumbnail_path).where(*image_filter)
             )
-            if os.path.exists(thumbnail_path):
-                os.remove(thumbnail_path)
+            row = result.first()
             
-            # DB에서 삭제
-            self.db.delete(db_image)
-            self.db.commit()
+            if row is None:
+                return False
             
-            return True
+            await self.db.execute(delete(UploadedImage).where(*image_filter))
+            await self.db.commit()
             
-        except Exception as e:
-            self.db.rollback()
-            print(f"Failed to delete image: {e}")
+        except Exception:
+            await self.db.rollback()
+            logger.exception("Failed to delete image %s", image_id)
             return False
+        
+        # 메타데이터 캐시 무효화
+        _IMAGE_META_CACHE.pop((image_id, user_id), None)
+        
+        # 파일 삭제 (원본 + 썸네일을 이벤트 루프 밖에서 한 번에 처리)
+        file_path, thumbnail_path = row
+        if not thumbnail_path:
+            # thumbnail_path 컬럼 추가 이전에 업로드된 이미지
+            thumbnail_path = os.path.join(
+                os.path.dirname(file_path),
+                f"thumb_{os.path.basename(file_path)}"
+            )
+        
+        await unlink_files([
+            os.path.join(self.upload_dir, file_path),
+            os.path.join(self.upload_dir, thumbnail_path)
+        ])
+        
+        return True
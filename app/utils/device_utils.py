@@ -1,106 +1,111 @@
 import re
-from typing import Dict, Any
+from types import MappingProxyType
+from typing import Any, Mapping
+
+# 모바일 디바이스 패턴
+# ('android.*mobile', 'iemobile' 은 'mobile' 에 포함되므로 제외해서 대체 분기 수를 줄임)
+MOBILE_PATTERNS = [
+    r'iphone',
+    r'ipod',
+    r'blackberry',
+    r'opera.*mini',
+    r'mobile'
+]
+
+# 태블릿 디바이스 패턴
+TABLET_PATTERNS = [
+    r'ipad',
+    r'android(?!.*mobile)',
+    r'tablet',
+    r'kindle',
+    r'playbook',
+    r'nook'
+]
+
+# 패턴 목록을 하나의 정규식으로 합쳐 모듈 로드 시 한 번만 컴파일
+_MOBILE_RE = re.compile("|".join(MOBILE_PATTERNS), re.IGNORECASE)
+_TABLET_RE = re.compile("|".join(TABLET_PATTERNS), re.IGNORECASE)
 
 def detect_device_type(user_agent: str = None) -> str:
     """User-Agent 문자열을 기반으로 디바이스 타입 감지"""
     if not user_agent:
         return "unknown"
     
-    user_agent = user_agent.lower()
-    
-    # 모바일 디바이스 패턴
-    mobile_patterns = [
-        r'android.*mobile',
-        r'iphone',
-        r'ipod',
-        r'blackberry',
-        r'opera.*mini',
-        r'iemobile',
-        r'mobile'
-    ]
-    
-    # 태블릿 디바이스 패턴
-    tablet_patterns = [
-        r'ipad',
-        r'android(?!.*mobile)',
-        r'tablet',
-        r'kindle',
-        r'playbook',
-        r'nook'
-    ]
-    
     # 태블릿 체크 (모바일보다 먼저 체크)
-    for pattern in tablet_patterns:
-        if re.search(pattern, user_agent):
-            return "tablet"
+    if _TABLET_RE.search(user_agent):
+        return "tablet"
     
     # 모바일 체크
-    for pattern in mobile_patterns:
-        if re.search(pattern, user_agent):
-            return "mobile"
+    if _MOBILE_RE.search(user_agent):
+        return "mobile"
     
     # 기본값은 웹(데스크톱)
     return "web"
 
-def get_device_capabilities(device_type: str) -> Dict[str, Any]:
+# 디바이스 타입별 기능 설정 (정적 테이블이므로 읽기 전용으로 한 번만 생성)
+_CAPABILITIES = MappingProxyType({
+    "web": MappingProxyType({
+        "face_detection": True,
+        "auto_capture": True,
+        "countdown": True,
+        "camera_selection": True,
+        "file_upload": True,
+        "drag_drop": True,
+        "keyboard_shortcuts": True,
+        "real_time_preview": True
+    }),
+    "mobile": MappingProxyType({
+        "face_detection": False,
+        "auto_capture": False,
+        "countdown": False,
+        "camera_selection": True,
+        "file_upload": True,
+        "drag_drop": False,
+        "keyboard_shortcuts": False,
+        "real_time_preview": False,
+        "native_camera": True,
+        "touch_gestures": True
+    }),
+    "tablet": MappingProxyType({
+        "face_detection": False,
+        "auto_capture": False,
+        "countdown": False,
+        "camera_selection": True,
+        "file_upload": True,
+        "drag_drop": True,
+        "keyboard_shortcuts": False,
+        "real_time_preview": False,
+        "native_camera": True,
+        "touch_gestures": True
+    })
+})
+
+def get_device_capabilities(device_type: str) -> Mapping[str, Any]:
     """디바이스 타입별 기능 설정"""
-    capabilities = {
-        "web": {
-            "face_detection": True,
-            "auto_capture": True,
-            "countdown": True,
-            "camera_selection": True,
-            "file_upload": True,
-            "drag_drop": True,
-            "keyboard_shortcuts": True,
-            "real_time_preview": True
-        },
-        "mobile": {
-            "face_detection": False,
-            "auto_capture": False,
-            "countdown": False,
-            "camera_selection": True,
-            "file_upload": True,
-            "drag_drop": False,
-            "keyboard_shortcuts": False,
-            "real_time_preview": False,
-            "native_camera": True,
-            "touch_gestures": True
-        },
-        "tablet": {
-            "face_detection": False,
-            "auto_capture": False,
-            "countdown": False,
-            "camera_selection": True,
-            "file_upload": True,
-            "drag_drop": True,
-            "keyboard_shortcuts": False,
-            "real_time_preview": False,
-            "native_camera": True,
-            "touch_gestures": True
-        }
-    }
-    
-    return capabilities.get(device_type, capabilities["web"])
+    return _CAPABILITIES.get(device_type, _CAPABILITIES["web"])
+
+# 디바이스별 최대 업로드 크기
+MAX_UPLOAD_SIZES = MappingProxyType({
+    "web": 10 * 1024 * 1024,      # 10MB
+    "mobile": 5 * 1024 * 1024,    # 5MB
+    "tablet": 8 * 1024 * 1024     # 8MB
+})
+
+# 업로드 허용 MIME 타입
+ALLOWED_UPLOAD_TYPES = frozenset({
+    "image/jpeg",
+    "image/jpg",
+    "image/png",
+    "image/webp"
+})
+
+def get_max_file_size(device_type: str) -> int:
+    """디바이스별 최대 업로드 크기 반환"""
+    return MAX_UPLOAD_SIZES.get(device_type, MAX_UPLOAD_SIZES["web"])
 
 def validate_file_for_device(file_size: int, file_type: str, device_type: str) -> bool:
     """디바이스별 파일 업로드 제한 검증"""
-    max_sizes = {
-        "web": 10 * 1024 * 1024,      # 10MB
-        "mobile": 5 * 1024 * 1024,    # 5MB
-        "tablet": 8 * 1024 * 1024     # 8MB
-    }
-    
-    allowed_types = [
-        "image/jpeg",
-        "image/jpg", 
-        "image/png",
-        "image/webp"
-    ]
-    
-    max_size = max_sizes.get(device_type, max_sizes["web"])
-    
     return (
-        file_size <= max_size and 
-        file_type.lower() in allowed_types
+        file_size <= get_max_file_size(device_type) and 
+        file_type.lower() in ALLOWED_UPLOAD_TYPES
     )
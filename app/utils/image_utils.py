@@ -1,120 +1,326 @@
-from PIL import Image, ExifTags
+from __future__ import annotations
+
+import logging
 import os
-import uuid
-from typing import Tuple, Optional, Dict, Any
-import mimetypes
+import re
+import string
+from typing import TYPE_CHECKING, Tuple, Optional, Dict, Any
+import struct
+import numpy as np
 
-def generate_unique_filename(original_filename: str) -> str:
-    """유니크한 파일명 생성"""
-    file_ext = os.path.splitext(original_filename)[1].lower()
-    unique_name = f"{uuid.uuid4().hex}{file_ext}"
-    return unique_name
+from app.utils.jpeg_codec import TURBOJPEG_AVAILABLE, encode_jpeg_rgb
 
-def get_image_info(image_path: str) -> Dict[str, Any]:
-    """이미지 메타데이터 추출"""
-    try:
-        with Image.open(image_path) as img:
-            width, height = img.size
-            format_name = img.format
-            mode = img.mode
-            
-            # EXIF 데이터 추출
-            exif_data = {}
-            if hasattr(img, '_getexif') and img._getexif() is not None:
-                exif = img._getexif()
-                for tag_id, value in exif.items():
-                    tag = ExifTags.TAGS.get(tag_id, tag_id)
-                    exif_data[tag] = value
-            
-            return {
-                "width": width,
-                "height": height,
-                "format": format_name,
-                "mode": mode,
-                "exif": exif_data,
-                "has_transparency": mode in ("RGBA", "LA") or "transparency" in img.info
-            }
-    except Exception as e:
-        return {
-            "width": None,
-            "height": None,
-            "format": None,
-            "mode": None,
-            "exif": {},
-            "has_transparency": False,
-            "error": str(e)
-        }
+logger = logging.getLogger(__name__)
 
-def resize_image(image_path: str, max_width: int = 1920, max_height: int = 1080, quality: int = 85) -> bool:
-    """이미지 리사이징 (원본 파일 덮어쓰기)"""
+# Pillow 는 실제로 이미지를 여는 함수 안에서 import (모듈 import 시 로딩 비용 제거)
+if TYPE_CHECKING:
+    from PIL import Image
+
+# SIMD(AVX2/NEON) Lanczos 리사이즈 (선택적 의존성)
+try:
+    from pic_scale import resize as simd_resize, Resampling as SimdResampling
+except ImportError:
+    simd_resize = None
+
+# 픽셀 디코딩/재인코딩 없이 DCT 블록 단위로 JPEG 회전 (선택적 의존성)
+try:
+    import jpegtran
+except (ImportError, OSError):
+    jpegtran = None
+
+# 이미지 포맷 시그니처 (파일 시작 바이트)
+IMAGE_SIGNATURES = (
+    b"\xff\xd8\xff",                    # JPEG
+    b"\x89PNG\r\n\x1a\n",              # PNG
+    b"GIF87a", b"GIF89a",              # GIF
+    b"BM",                             # BMP
+    b"II*\x00", b"MM\x00*",             # TIFF
+)
+
+# HEIF/HEIC ftyp 브랜드
+HEIF_BRANDS = frozenset({b"heic", b"heix", b"hevc", b"hevx", b"mif1", b"msf1", b"avif"})
+
+# EXIF Orientation 태그
+ORIENTATION_TAG = 0x0112
+
+# EXIF 를 담을 수 있는 포맷 (그 외 포맷은 EXIF 파싱을 시도하지 않음)
+EXIF_FORMATS = frozenset({"JPEG", "MPO", "TIFF", "WEBP", "PNG", "HEIF"})
+
+def _parse_orientation(tiff: bytes) -> int:
+    """TIFF 헤더 + IFD0 엔트리만 보고 Orientation 값 추출 (없으면 1)"""
+    if tiff[:2] == b"II":
+        endian = "<"
+    elif tiff[:2] == b"MM":
+        endian = ">"
+    else:
+        return 1
+    
     try:
-        with Image.open(image_path) as img:
-            # 원본 크기 확인
-            original_width, original_height = img.size
-            
-            # 리사이징이 필요한지 확인
-            if original_width <= max_width and original_height <= max_height:
-                return True  # 리사이징 불필요
-            
-            # 비율 유지하면서 리사이징
-            ratio = min(max_width / original_width, max_height / original_height)
-            new_width = int(original_width * ratio)
-            new_height = int(original_height * ratio)
+        ifd_offset = struct.unpack_from(endian + "I", tiff, 4)[0]
+        entry_count = struct.unpack_from(endian + "H", tiff, ifd_offset)[0]
+        
+        for i in range(entry_count):
+            # 엔트리: tag(2) + type(2) + count(4) + value(4, SHORT 값은 앞 2바이트)
+            tag, _, _, value = struct.unpack_from(endian + "HHIH", tiff, ifd_offset + 2 + i * 12)
+            if tag == ORIENTATION_TAG:
+                return value
+    except struct.error:
+        pass
+    
+    return 1
+
+def _read_orientation(path: str) -> Optional[int]:
+    """JPEG APP1(EXIF) 세그먼트의 IFD0 에서 Orientation 만 읽음 (JPEG 가 아니면 None)"""
+    with open(path, "rb") as f:
+        if f.read(2) != b"\xff\xd8":
+            return None
+        
+        while True:
+            marker = f.read(2)
+            # SOS(스캔 시작) / EOI 이후에는 메타데이터 세그먼트가 없음
+            if len(marker) < 2 or marker[0] != 0xFF or marker[1] in (0xDA, 0xD9):
+                return 1
             
-            # 이미지 리사이징
-            resized_img = img.resize((new_width, new_height), Image.Resampling.LANCZOS)
+            length_bytes = f.read(2)
+            if len(length_bytes) < 2:
+                return 1
+            length = int.from_bytes(length_bytes, "big") - 2
             
-            # EXIF 정보 보존하면서 저장
-            exif = img.info.get('exif')
-            save_kwargs = {"quality": quality, "optimize": True}
-            if exif:
-                save_kwargs["exif"] = exif
+            # APP1 중 EXIF 세그먼트만 파싱 (XMP 등 다른 APP1 및 나머지 세그먼트는 건너뜀)
+            if marker[1] == 0xE1:
+                segment = f.read(length)
+                if segment.startswith(b"Exif\x00\x00"):
+                    return _parse_orientation(segment[6:])
+            else:
+                f.seek(length, os.SEEK_CUR)
+
+def _png_has_exif(path: str) -> bool:
+    """PNG 청크 헤더만 따라가면서 eXIf 청크 존재 여부 확인"""
+    with open(path, "rb") as f:
+        # 8바이트 PNG 시그니처 이후부터 청크: length(4) + type(4) + data + CRC(4)
+        f.seek(8)
+        while True:
+            header = f.read(8)
+            if len(header) < 8:
+                return False
             
-            resized_img.save(image_path, **save_kwargs)
-            return True
+            length, chunk_type = struct.unpack(">I4s", header)
+            if chunk_type == b"eXIf":
+                return True
+            if chunk_type == b"IEND":
+                return False
             
+            f.seek(length + 4, os.SEEK_CUR)
+
+def _exif_orientation(img: Image.Image, path: str) -> int:
+    """Pillow 로 EXIF Orientation 값 확인 (EXIF 를 담을 수 없는 포맷이나 eXIf 청크 없는 PNG 는 파싱하지 않음)"""
+    if img.format not in EXIF_FORMATS:
+        return 1
+    if img.format == "PNG" and not _png_has_exif(path):
+        return 1
+    return img.getexif().get(ORIENTATION_TAG, 1)
+
+def _rotate_lossless(src: str, dst: str) -> bool:
+    """jpegtran 으로 EXIF 방향에 맞게 DCT 블록 단위 무손실 회전 (jpegtran 미설치 또는 실패 시 False)"""
+    if jpegtran is None:
+        return False
+    
+    try:
+        # Orientation 태그도 1로 초기화되어 중복 회전 방지
+        jpegtran.JPEGImage(src).exif_autotransform().save(dst)
+        return True
     except Exception as e:
-        print(f"Image resize error: {e}")
+        logger.warning("Lossless rotation failed, falling back to Pillow: %s", e)
         return False
 
-def create_thumbnail(image_path: str, thumbnail_path: str, size: Tuple[int, int] = (300, 300)) -> bool:
-    """썸네일 생성"""
+def _resize_lanczos(img: Image.Image, size: Tuple[int, int]) -> Image.Image:
+    """Lanczos 리사이즈 (pic-scale 이 설치되어 있으면 SIMD 구현 사용)"""
+    from PIL import Image
+    if simd_resize is not None:
+        return simd_resize(img, size, SimdResampling.LANCZOS, workers=0)
+    return img.resize(size, Image.Resampling.LANCZOS)
+
+def _save_jpeg(img: Image.Image, path: str, quality: int, **save_kwargs):
+    """JPEG 저장 (TurboJPEG 가 있고 보존할 EXIF 가 없으면 SIMD 인코더 사용)"""
+    if TURBOJPEG_AVAILABLE and img.mode == "RGB" and "exif" not in save_kwargs:
+        with open(path, "wb") as f:
+            f.write(encode_jpeg_rgb(np.asarray(img), quality))
+        return
+    
+    img.save(path, "JPEG", quality=quality, **save_kwargs)
+
+def generate_unique_filename(original_filename: str) -> str:
+    """유니크한 파일명 생성"""
+    file_ext = os.path.splitext(original_filename)[1].lower()
+    # uuid4().hex 와 같은 128비트 난수를 UUID 객체 생성 없이 사용
+    unique_name = f"{os.urandom(16).hex()}{file_ext}"
+    return unique_name
+
+def _decode_error(e: Exception) -> Dict[str, Any]:
+    """열기/디코딩 실패 결과 (업로드 서비스에서 잘못된 이미지로 처리)"""
+    logger.warning("Image decode error: %s", e)
+    return {
+        "width": None,
+        "height": None,
+        "format": None,
+        "mode": None,
+        "error": str(e)
+    }
+
+def process_in_one(
+    src: str,
+    dst: str,
+    thumb: str,
+    max_size: Tuple[int, int] = (1920, 1080),
+    thumb_size: Tuple[int, int] = (300, 300),
+    quality: int = 85
+) -> Dict[str, Any]:
+    """메타데이터 추출 + EXIF 회전 + 리사이징 + 썸네일 생성을 한 번의 열기/디코딩으로 처리"""
+    from PIL import Image, ImageOps, UnidentifiedImageError
+    
+    # JPEG 는 APP1 세그먼트에서 Orientation 만 직접 읽음 (JPEG 가 아니면 None)
+    orientation = _read_orientation(src)
+    
+    # 열기/디코딩 실패(인식할 수 없는 포맷, 손상/잘린 파일)만 잘못된 이미지로 반환하고,
+    # 저장 중 디스크 부족/권한 오류 등은 호출자에게 그대로 전달 (서버 오류로 처리)
     try:
-        with Image.open(image_path) as img:
-            # 썸네일 생성 (비율 유지)
-            img.thumbnail(size, Image.Resampling.LANCZOS)
-            
-            # RGB로 변환 (JPEG 저장을 위해)
-            if img.mode in ("RGBA", "P"):
-                img = img.convert("RGB")
-            
-            img.save(thumbnail_path, "JPEG", quality=80, optimize=True)
-            return True
+        img = Image.open(src)
+    except (UnidentifiedImageError, OSError, Image.DecompressionBombError) as e:
+        return _decode_error(e)
+    
+    with img:
+        # 메타데이터는 디코딩 전 헤더 기준 (원본 크기)
+        width, height = img.size
+        format_name = img.format
+        mode = img.mode
+        
+        if orientation is None:
+            orientation = _exif_orientation(img, src)
+        rotated = orientation != 1
+        
+        # 90도 회전(5~8)이면 회전 후 가로/세로가 바뀜
+        target_w, target_h = (height, width) if orientation in (5, 6, 7, 8) else (width, height)
+        resized = target_w > max_size[0] or target_h > max_size[1]
+        
+        if resized:
+            # 축소가 필요한 JPEG 는 목표 크기 이상인 가장 작은 DCT 스케일로 디코딩
+            draft_size = (max_size[1], max_size[0]) if orientation in (5, 6, 7, 8) else max_size
+            img.draft("RGB", draft_size)
+        elif not rotated:
+            # 회전/축소가 필요 없으면 원본은 그대로 두고 썸네일만 만들므로, JPEG 는 썸네일 크기
+            # 이상인 가장 작은 DCT 스케일(1/2, 1/4, 1/8)로 디코딩 (JPEG 가 아니면 아무 작업도 하지 않음)
+            img.draft("RGB", thumb_size)
+        
+        try:
+            img.load()
+        except OSError as e:
+            return _decode_error(e)
+        
+        # EXIF 방향에 따라 회전 (회전 후 orientation 태그는 제거됨, 회전이 없으면 EXIF 전체를 파싱하지 않음)
+        transposed = ImageOps.exif_transpose(img) if rotated else img
+        
+        # 비율 유지하면서 리사이징 (draft 로 이미 목표 크기에 맞게 디코딩된 경우는 생략)
+        if transposed.width > max_size[0] or transposed.height > max_size[1]:
+            ratio = min(max_size[0] / transposed.width, max_size[1] / transposed.height)
+            transposed = _resize_lanczos(
+                transposed, (int(transposed.width * ratio), int(transposed.height * ratio))
+            )
+        
+        # 축소 없이 회전만 필요한 JPEG 는 재인코딩 없이 jpegtran 으로 무손실 회전
+        # (exif_transpose 에서 픽셀을 이미 읽었으므로 src 와 dst 가 같은 경로여도 안전)
+        lossless = rotated and not resized and format_name == "JPEG" and _rotate_lossless(src, dst)
+        
+        # 회전/리사이징이 있었던 경우에만 원본 파일 덮어쓰기 (불필요한 재인코딩 방지)
+        if (rotated or resized) and not lossless:
+            # 업로드 원본은 용량 이득이 작은 optimize(2-pass 허프만) 없이 저장
+            save_kwargs = {"quality": quality, "progressive": False, "subsampling": 2}
+            exif = transposed.info.get("exif")
+            if exif:
+                save_kwargs["exif"] = exif
             
-    except Exception as e:
-        print(f"Thumbnail creation error: {e}")
-        return False
+            if format_name == "JPEG":
+                _save_jpeg(transposed, dst, **save_kwargs)
+            else:
+                transposed.save(dst, **save_kwargs)
+        
+        # 메모리에 있는 이미지로 썸네일 생성 (비율 유지)
+        transposed.thumbnail(thumb_size, Image.Resampling.LANCZOS)
+        
+        # RGB로 변환 (JPEG 저장을 위해)
+        if transposed.mode in ("RGBA", "P"):
+            transposed = transposed.convert("RGB")
+        
+        _save_jpeg(transposed, thumb, quality=80, optimize=True)
+        
+        return {
+            "width": width,
+            "height": height,
+            "format": format_name,
+            "mode": mode
+        }
+
+def _sniff_image(header: bytes) -> bool:
+    """파일 앞부분 시그니처(매직 바이트)로 이미지 포맷 확인"""
+    if header.startswith(IMAGE_SIGNATURES):
+        return True
+    # WebP: RIFF....WEBP / HEIC: ....ftypheic 등
+    if header[:4] == b"RIFF" and header[8:12] == b"WEBP":
+        return True
+    return header[4:8] == b"ftyp" and header[8:12] in HEIF_BRANDS
 
-def validate_image_file(file_path: str) -> bool:
-    """이미지 파일 유효성 검증"""
+def validate_image_file(file_path: str, deep: bool = False) -> bool:
+    """이미지 파일 유효성 검증 (기본은 시그니처만 확인, deep=True 면 Pillow verify)"""
+    from PIL import Image
     try:
-        with Image.open(file_path) as img:
-            # 이미지 로드 테스트
-            img.verify()
+        with open(file_path, "rb") as f:
+            if not _sniff_image(f.read(32)):
+                return False
+        
+        if deep:
+            with Image.open(file_path) as img:
+                # 이미지 전체 구조 검사
+                img.verify()
         return True
     except Exception:
         return False
 
+# 업로드에서 주로 쓰는 확장자의 MIME 타입 (mimetypes 데이터베이스 조회 생략)
+IMAGE_MIME_TYPES = {
+    ".jpg": "image/jpeg",
+    ".jpeg": "image/jpeg",
+    ".png": "image/png",
+    ".webp": "image/webp",
+    ".heic": "image/heic",
+    ".heif": "image/heif",
+    ".gif": "image/gif",
+}
+
 def get_mime_type(file_path: str) -> str:
     """파일의 MIME 타입 추출"""
-    mime_type, _ = mimetypes.guess_type(file_path)
+    mime_type = IMAGE_MIME_TYPES.get(os.path.splitext(file_path)[1].lower())
+    if mime_type is None:
+        import mimetypes
+        mime_type, _ = mimetypes.guess_type(file_path)
     return mime_type or "application/octet-stream"
 
+# 파일명에 허용하는 ASCII 문자 (정규식 \w, -, . 와 동일)
+_SAFE_FILENAME_CHARS = frozenset(string.ascii_letters + string.digits + "-_.")
+
+# 허용되지 않는 ASCII 문자를 언더스코어로 바꾸는 변환 테이블
+_FILENAME_TRANS = str.maketrans({
+    c: "_" for c in map(chr, range(128)) if c not in _SAFE_FILENAME_CHARS
+})
+
+# 비 ASCII 파일명용 (한글 등 유니코드 문자는 유지)
+_UNSAFE_FILENAME_RE = re.compile(r'[^\w\-_\.]')
+
 def sanitize_filename(filename: str) -> str:
     """파일명에서 위험한 문자 제거"""
-    # 위험한 문자들을 언더스코어로 대체
-    import re
-    safe_filename = re.sub(r'[^\w\-_\.]', '_', filename)
+    # 위험한 문자들을 언더스코어로 대체 (ASCII 파일명은 translate 한 번으로 처리)
+    if filename.isascii():
+        safe_filename = filename.translate(_FILENAME_TRANS)
+    else:
+        safe_filename = _UNSAFE_FILENAME_RE.sub('_', filename)
     
     # 파일명이 너무 길면 자르기
     name, ext = os.path.splitext(safe_filename)
@@ -122,31 +328,3 @@ def sanitize_filename(filename: str) -> str:
         name = name[:100]
     
     return f"{name}{ext}"
-
-def rotate_image_by_exif(image_path: str) -> bool:
-    """EXIF 정보에 따라 이미지 회전"""
-    try:
-        with Image.open(image_path) as img:
-            # EXIF orientation 태그 확인
-            if hasattr(img, '_getexif') and img._getexif() is not None:
-                exif = img._getexif()
-                orientation = exif.get(274)  # Orientation 태그
-                
-                if orientation == 3:
-                    img = img.rotate(180, expand=True)
-                elif orientation == 6:
-                    img = img.rotate(270, expand=True)
-                elif orientation == 8:
-                    img = img.rotate(90, expand=True)
-                else:
-                    return True  # 회전 불필요
-                
-                # 회전된 이미지 저장
-                img.save(image_path, quality=95, optimize=True)
-                return True
-            
-        return True
-        
-    except Exception as e:
-        print(f"Image rotation error: {e}")
-        return False
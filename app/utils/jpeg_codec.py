@@ -0,0 +1,25 @@
+import numpy as np
+from typing import Optional
+
+# libjpeg-turbo 바인딩 (선택적 의존성, SIMD IDCT/FDCT 사용)
+# 파이썬 패키지가 있어도 libturbojpeg 공유 라이브러리가 없으면 생성에 실패하므로 함께 처리
+try:
+    from turbojpeg import TurboJPEG, TJPF_RGB
+    turbo_jpeg = TurboJPEG()
+except Exception:
+    turbo_jpeg = None
+
+TURBOJPEG_AVAILABLE = turbo_jpeg is not None
+
+# JPEG SOI 마커
+JPEG_MAGIC = b"\xff\xd8"
+
+def decode_jpeg_rgb(data: bytes) -> Optional[np.ndarray]:
+    """JPEG 바이트를 RGB ndarray 로 디코딩 (TurboJPEG 미설치 또는 JPEG 가 아니면 None)"""
+    if turbo_jpeg is None or not data.startswith(JPEG_MAGIC):
+        return None
+    return turbo_jpeg.decode(data, pixel_format=TJPF_RGB)
+
+def encode_jpeg_rgb(image: np.ndarray, quality: int) -> bytes:
+    """RGB ndarray 를 TurboJPEG 로 JPEG 인코딩"""
+    return turbo_jpeg.encode(image, quality=quality, pixel_format=TJPF_RGB)
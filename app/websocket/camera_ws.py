@@ -1,27 +1,48 @@
 from fastapi import WebSocket, WebSocketDisconnect, Depends, Query
 from fastapi.routing import APIRouter
 import json
+import orjson
 import uuid
 import asyncio
+import logging
+import time
 from datetime import datetime
-from typing import Optional
+from typing import Dict, Optional
 
 from app.websocket.manager import manager
-from app.services.face_detection import get_face_detector
+from app.services.face_detection import FaceDetectionService, get_face_detector
 from app.core.security import jwt_handler
 from app.config.settings import settings
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter()
 
+# 초 단위로 캐시한 ISO 타임스탬프 (메시지마다 datetime 생성/포맷 비용 절감)
+_ts_cache = {"epoch": 0, "iso": ""}
+
+def _now_iso() -> str:
+    """현재 시각의 ISO 문자열 (초 단위 정밀도, 같은 초 안에서는 캐시 재사용)"""
+    now = int(time.time())
+    if _ts_cache["epoch"] != now:
+        _ts_cache["epoch"] = now
+        _ts_cache["iso"] = datetime.fromtimestamp(now).isoformat()
+    return _ts_cache["iso"]
+
+# countdown_tick 메시지의 미리 직렬화된 JSON 템플릿 (session_id 를 채운 뒤 remaining, timestamp 를 채움)
+COUNTDOWN_TICK_TEMPLATE = b'{"type":"countdown_tick","session_id":%b,"remaining":%%d,"timestamp":"%%b"}'
+
 class CameraWebSocketHandler:
     def __init__(self):
-        self.face_detector = get_face_detector()
         self.countdown_duration = settings.COUNTDOWN_SECONDS
+        # 연결별 진행 중인 카운트다운 태스크
+        self.countdown_tasks: Dict[str, asyncio.Task] = {}
     
     async def handle_connection(
         self, 
         websocket: WebSocket, 
         session_id: str,
+        face_detector: FaceDetectionService,
         token: Optional[str] = None
     ):
         """WebSocket 연결 처리"""
@@ -46,44 +67,61 @@ class CameraWebSocketHandler:
                 "type": "connected",
                 "connection_id": connection_id,
                 "session_id": session_id,
-                "timestamp": datetime.now().isoformat()
+                "timestamp": _now_iso()
             }, connection_id)
             
             # 메시지 처리 루프
             while True:
                 try:
-                    # 메시지 수신 (타임아웃 5초)
-                    data = await asyncio.wait_for(
-                        websocket.receive_text(), 
+                    # 메시지 수신 (타임아웃 5초, 텍스트/바이너리 프레임 모두 수신)
+                    message = await asyncio.wait_for(
+                        websocket.receive(), 
                         timeout=5.0
                     )
                     
+                    if message["type"] == "websocket.disconnect":
+                        break
+                    
+                    # 바이너리 프레임은 Base64 없이 보낸 원본 이미지 (얼굴 감지 요청)
+                    if message.get("bytes") is not None:
+                        await self.handle_face_detection(
+                            connection_id, session_id, {"image": message["bytes"]}, face_detector
+                        )
+                        continue
+                    
                     # 메시지 처리
-                    await self.handle_message(connection_id, session_id, data)
+                    await self.handle_message(connection_id, session_id, message["text"], face_detector)
                     
                 except asyncio.TimeoutError:
                     # 주기적 핑 전송
                     await manager.send_personal_message({
                         "type": "ping",
-                        "timestamp": datetime.now().isoformat()
+                        "timestamp": _now_iso()
                     }, connection_id)
                     
                 except WebSocketDisconnect:
                     break
                     
         except Exception as e:
-            print(f"WebSocket error for {connection_id}: {e}")
+            logger.exception("WebSocket error for %s: %s", connection_id, e)
         finally:
+            self.cancel_countdown(connection_id)
             manager.disconnect(connection_id)
     
-    async def handle_message(self, connection_id: str, session_id: str, raw_data: str):
+    async def handle_message(
+        self,
+        connection_id: str,
+        session_id: str,
+        raw_data: str,
+        face_detector: FaceDetectionService
+    ):
         """메시지 처리"""
         try:
             data = json.loads(raw_data)
             message_type = data.get("type")
             
             if message_type == "face_detection":
-                await self.handle_face_detection(connection_id, session_id, data)
+                await self.handle_face_detection(connection_id, session_id, data, face_detector)
             elif message_type == "start_countdown":
                 await self.handle_start_countdown(connection_id, session_id, data)
             elif message_type == "stop_countdown":
@@ -100,7 +138,13 @@ class CameraWebSocketHandler:
         except Exception as e:
             await self.send_error(connection_id, f"Message handling error: {str(e)}")
     
-    async def handle_face_detection(self, connection_id: str, session_id: str, data: dict):
+    async def handle_face_detection(
+        self,
+        connection_id: str,
+        session_id: str,
+        data: dict,
+        face_detector: FaceDetectionService
+    ):
         """얼굴 감지 처리"""
         try:
             image_data = data.get("image")
@@ -108,8 +152,8 @@ class CameraWebSocketHandler:
                 await self.send_error(connection_id, "No image data provided")
                 return
             
-            # 얼굴 감지 수행
-            detection_result = self.face_detector.detect_faces_from_base64(image_data)
+            # 얼굴 감지 수행 (다른 연결의 프레임과 배치로 묶여서 처리됨)
+            detection_result = await face_detector.detect_faces_async(image_data)
             
             # 안전한 값 추출 (기본값 포함)
             detected = detection_result.get("detected", False)
@@ -120,7 +164,7 @@ class CameraWebSocketHandler:
             
             # 에러가 있는 경우 처리
             if "error" in detection_result:
-                print(f"Face detection error: {detection_result['error']}")
+                logger.warning("Face detection error: %s", detection_result["error"])
                 await self.send_error(connection_id, f"Face detection failed: {detection_result['error']}")
                 return
             
@@ -133,7 +177,7 @@ class CameraWebSocketHandler:
                 "face_count": face_count,
                 "ready_for_capture": ready_for_capture,
                 "feedback": feedback,
-                "timestamp": datetime.now().isoformat()
+                "timestamp": _now_iso()
             }
             
             await manager.send_personal_message(response, connection_id)
@@ -143,20 +187,21 @@ class CameraWebSocketHandler:
                 await self.start_auto_countdown(connection_id, session_id)
                 
         except Exception as e:
-            print(f"Face detection handler error: {str(e)}")
+            logger.exception("Face detection handler error: %s", e)
             await self.send_error(connection_id, f"Face detection error: {str(e)}")
     
     async def handle_start_countdown(self, connection_id: str, session_id: str, data: dict):
         """수동 카운트다운 시작"""
         countdown_duration = data.get("duration", self.countdown_duration)
-        await self.start_countdown(connection_id, session_id, countdown_duration)
+        self.launch_countdown(connection_id, session_id, countdown_duration)
     
     async def handle_stop_countdown(self, connection_id: str, session_id: str, data: dict):
         """카운트다운 중지"""
+        self.cancel_countdown(connection_id)
         await manager.send_personal_message({
             "type": "countdown_stopped",
             "session_id": session_id,
-            "timestamp": datetime.now().isoformat()
+            "timestamp": _now_iso()
         }, connection_id)
     
     async def handle_capture_ready(self, connection_id: str, session_id: str, data: dict):
@@ -164,19 +209,40 @@ class CameraWebSocketHandler:
         await manager.send_personal_message({
             "type": "capture_command",
             "session_id": session_id,
-            "timestamp": datetime.now().isoformat()
+            "timestamp": _now_iso()
         }, connection_id)
     
     async def handle_ping(self, connection_id: str):
         """핑 응답"""
         await manager.send_personal_message({
             "type": "pong",
-            "timestamp": datetime.now().isoformat()
+            "timestamp": _now_iso()
         }, connection_id)
     
     async def start_auto_countdown(self, connection_id: str, session_id: str):
-        """자동 카운트다운 시작"""
-        await self.start_countdown(connection_id, session_id, self.countdown_duration, auto=True)
+        """자동 카운트다운 시작 (이미 진행 중이면 무시)"""
+        if connection_id in self.countdown_tasks:
+            return
+        self.launch_countdown(connection_id, session_id, self.countdown_duration, auto=True)
+    
+    def launch_countdown(self, connection_id: str, session_id: str, duration: int, auto: bool = False):
+        """카운트다운을 백그라운드 태스크로 시작 (진행 중인 카운트다운은 교체)"""
+        self.cancel_countdown(connection_id)
+        task = asyncio.create_task(self.start_countdown(connection_id, session_id, duration, auto))
+        self.countdown_tasks[connection_id] = task
+        
+        def _unregister(finished: asyncio.Task):
+            # 교체된 이전 태스크가 새 태스크의 등록을 지우지 않도록 확인
+            if self.countdown_tasks.get(connection_id) is finished:
+                del self.countdown_tasks[connection_id]
+        
+        task.add_done_callback(_unregister)
+    
+    def cancel_countdown(self, connection_id: str):
+        """진행 중인 카운트다운 태스크 취소"""
+        task = self.countdown_tasks.pop(connection_id, None)
+        if task is not None:
+            task.cancel()
     
     async def start_countdown(self, connection_id: str, session_id: str, duration: int, auto: bool = False):
         """카운트다운 시작"""
@@ -187,32 +253,37 @@ class CameraWebSocketHandler:
                 "session_id": session_id,
                 "duration": duration,
                 "auto": auto,
-                "timestamp": datetime.now().isoformat()
+                "timestamp": _now_iso()
             }, connection_id)
             
+            # 틱 메시지는 세션 ID 까지 채운 템플릿을 한 번만 만들고 매 초 남은 시간/시각만 채움
+            # (세션 ID 에 % 가 있으면 두 번째 포맷팅에서 변환 지정자로 해석되지 않도록 이스케이프)
+            tick_template = COUNTDOWN_TICK_TEMPLATE % orjson.dumps(session_id).replace(b"%", b"%%")
+            
+            # 시작 시각 기준 절대 시각으로 깨어나서 전송 지연이 누적되지 않도록 함
+            loop = asyncio.get_running_loop()
+            start = loop.time()
+            
             # 카운트다운 실행
-            for remaining in range(duration, 0, -1):
-                # 연결이 여전히 활성상태인지 확인
-                if connection_id not in manager.active_connections:
+            for elapsed, remaining in enumerate(range(duration, 0, -1), start=1):
+                # 전송 실패 (연결 종료) 시 바로 중단
+                sent = await manager.send_personal_bytes(
+                    tick_template % (remaining, _now_iso().encode()),
+                    connection_id,
+                    "countdown_tick"
+                )
+                if not sent:
                     return
                 
-                await manager.send_personal_message({
-                    "type": "countdown_tick",
-                    "session_id": session_id,
-                    "remaining": remaining,
-                    "timestamp": datetime.now().isoformat()
-                }, connection_id)
-                
-                await asyncio.sleep(1)
+                await asyncio.sleep(start + elapsed - loop.time())
             
-            # 카운트다운 완료 - 촬영 명령
-            if connection_id in manager.active_connections:
-                await manager.send_personal_message({
-                    "type": "capture_command",
-                    "session_id": session_id,
-                    "auto": auto,
-                    "timestamp": datetime.now().isoformat()
-                }, connection_id)
+            # 카운트다운 완료 - 촬영 명령 (연결이 끊겼으면 전송되지 않음)
+            await manager.send_personal_message({
+                "type": "capture_command",
+                "session_id": session_id,
+                "auto": auto,
+                "timestamp": _now_iso()
+            }, connection_id)
                 
         except Exception as e:
             await self.send_error(connection_id, f"Countdown error: {str(e)}")
@@ -222,7 +293,7 @@ class CameraWebSocketHandler:
         await manager.send_personal_message({
             "type": "error",
             "message": error_message,
-            "timestamp": datetime.now().isoformat()
+            "timestamp": _now_iso()
         }, connection_id)
 
 # WebSocket 핸들러 인스턴스
@@ -232,16 +303,18 @@ camera_handler = CameraWebSocketHandler()
 async def camera_websocket_endpoint(
     websocket: WebSocket,
     session_id: str,
-    token: Optional[str] = Query(None)
+    token: Optional[str] = Query(None),
+    face_detector: FaceDetectionService = Depends(get_face_detector)
 ):
     """카메라 WebSocket 엔드포인트"""
-    await camera_handler.handle_connection(websocket, session_id, token)
+    await camera_handler.handle_connection(websocket, session_id, face_detector, token)
 
 @router.websocket("/ws/camera")
 async def camera_websocket_no_session(
     websocket: WebSocket,
-    token: Optional[str] = Query(None)
+    token: Optional[str] = Query(None),
+    face_detector: FaceDetectionService = Depends(get_face_detector)
 ):
     """세션 없는 카메라 WebSocket (테스트용)"""
     session_id = str(uuid.uuid4())
-    await camera_handler.handle_connection(websocket, session_id, token)
+    await camera_handler.handle_connection(websocket, session_id, face_detector, token)
@@ -1,132 +1,344 @@
 from fastapi import WebSocket, WebSocketDisconnect
-from typing import Dict, List, Set
-import json
+from typing import Awaitable, Callable, Dict, List, Optional, Set, Tuple, Union
+import orjson
 import asyncio
-from datetime import datetime
+import logging
+import numpy as np
+import time
+from datetime import datetime, timedelta
+
+logger = logging.getLogger(__name__)
+
+# 같은 프레임에 묶인 카운트다운 틱은 마지막 값만 전송
+COALESCED_TYPES = frozenset({"countdown_tick"})
+
+# last_activity 배열 초기 크기 (슬롯이 부족하면 두 배로 늘림)
+INITIAL_SLOT_CAPACITY = 1024
+
+# 연결별 송신 대기 큐 최대 길이 (넘치면 읽지 못하는 느린 클라이언트로 보고 연결 종료)
+SEND_QUEUE_MAXSIZE = 1024
+
+# 느린 클라이언트 연결 종료 코드 (1013: Try Again Later)
+SLOW_CLIENT_CLOSE_CODE = 1013
+
+# 한 프레임으로 묶는 최대 메시지 수 / 바이트 수
+MAX_BATCH_MESSAGES = 64
+MAX_BATCH_BYTES = 64 * 1024
+
+# 여러 메시지를 묶어 보내는 batch 봉투
+BATCH_PREFIX = b'{"type":"batch","msgs":['
+BATCH_SUFFIX = b"]}"
+
+# 송신 큐 항목: (메시지 타입, dict 또는 미리 직렬화된 JSON 바이트)
+QueuedMessage = Tuple[Optional[str], Union[dict, bytes]]
+
+def _coalesce(batch: List[QueuedMessage]) -> List[QueuedMessage]:
+    """배치 안에서 COALESCED_TYPES 메시지는 타입별로 마지막 것만 남김"""
+    last_index = {}
+    for index, (message_type, _) in enumerate(batch):
+        if message_type in COALESCED_TYPES:
+            last_index[message_type] = index
+
+    if not last_index:
+        return batch
+
+    return [
+        item for index, item in enumerate(batch)
+        if item[0] not in COALESCED_TYPES or last_index[item[0]] == index
+    ]
+
+def _envelope(encoded: List[bytes]) -> bytes:
+    """직렬화된 메시지들을 하나의 프레임으로 묶음 (하나뿐이면 그대로)"""
+    if len(encoded) == 1:
+        return encoded[0]
+    return BATCH_PREFIX + b",".join(encoded) + BATCH_SUFFIX
+
+def _encode_frames(batch: List[QueuedMessage]) -> List[bytes]:
+    """배치를 MAX_BATCH_BYTES 이하의 프레임들로 직렬화 (미리 직렬화된 메시지는 그대로 이어 붙임)"""
+    frames = []
+    group = []
+    group_size = 0
+    
+    for _, payload in batch:
+        encoded = payload if isinstance(payload, bytes) else orjson.dumps(payload)
+        # 크기 제한을 넘기면 지금까지 모은 메시지를 한 프레임으로 내보냄 (단일 대형 메시지는 단독 프레임)
+        if group and group_size + len(encoded) > MAX_BATCH_BYTES:
+            frames.append(_envelope(group))
+            group = []
+            group_size = 0
+        group.append(encoded)
+        group_size += len(encoded)
+    
+    if group:
+        frames.append(_envelope(group))
+    return frames
+
+async def _close_quietly(websocket: WebSocket, code: int):
+    """이미 끊긴 소켓이어도 예외 없이 종료 시도"""
+    try:
+        await websocket.close(code=code)
+    except Exception:
+        pass
+
+def _asgi_send(websocket: WebSocket) -> Callable[[dict], Awaitable[None]]:
+    """accept 이후 프레임 전송에 쓸 ASGI send 호출 객체
+
+    Starlette 래퍼의 메서드 호출/상태 확인을 건너뛰도록 원본 send 를 사용하고,
+    내부 속성이 없으면 래퍼의 send 로 대체
+    """
+    return getattr(websocket, "_send", None) or websocket.send
+
+def _unindex(index: dict, key, entry: "ConnEntry"):
+    """인덱스의 연결 목록에서 entry 제거 (목록이 비면 키 삭제)
+
+    연결 시 항상 인덱싱되므로 존재 확인 없이 바로 조회하고, 없는 경우만 예외로 처리
+    """
+    try:
+        entries = index[key]
+        entries.remove(entry)
+    except (KeyError, ValueError):
+        return
+    if not entries:
+        del index[key]
+
+class ConnEntry:
+    """연결 하나의 정보 (__slots__ 로 인스턴스 dict 없이 저장)"""
+    __slots__ = (
+        "connection_id", "slot", "websocket", "session_id", "user_id",
+        "connected_at", "queue", "writer"
+    )
+
+    def __init__(
+        self,
+        connection_id: str,
+        slot: int,
+        websocket: WebSocket,
+        session_id: Optional[str],
+        user_id: Optional[int],
+        queue: asyncio.Queue
+    ):
+        self.connection_id = connection_id
+        # last_activity 배열 인덱스
+        self.slot = slot
+        self.websocket = websocket
+        self.session_id = session_id
+        self.user_id = user_id
+        self.connected_at = datetime.now()
+        # 연결이 해제되면 None (해제 후 남아 있는 참조로의 전송 방지)
+        self.queue: Optional[asyncio.Queue] = queue
+        self.writer: Optional[asyncio.Task] = None
 
 class ConnectionManager:
     def __init__(self):
-        # 활성 연결들
-        self.active_connections: Dict[str, WebSocket] = {}
+        # 활성 연결들 (연결 ID → 연결 정보)
+        self.connections: Dict[str, ConnEntry] = {}
+        
+        # 슬롯 번호 → 연결 정보 (비활성 연결 정리 시 last_activity 인덱스에서 역참조)
+        self._entries: List[Optional[ConnEntry]] = []
+        
+        # 해제된 슬롯 재사용 목록
+        self._free_slots: List[int] = []
+        
+        # 마지막 활동 시각 (time.monotonic() 초, 정리 작업에서 벡터화 비교하도록 ndarray 로 저장)
+        # 빈 슬롯은 inf 로 두어 비활성 판정에서 제외
+        self._last_activity = np.full(INITIAL_SLOT_CAPACITY, np.inf)
         
-        # 세션별 연결 매핑
-        self.session_connections: Dict[str, Set[str]] = {}
+        # 세션별 연결 목록 (세션당 연결 수가 적으므로 set 대신 list)
+        self.session_connections: Dict[str, List[ConnEntry]] = {}
         
-        # 사용자별 연결 매핑
-        self.user_connections: Dict[int, Set[str]] = {}
+        # 사용자별 연결 목록
+        self.user_connections: Dict[int, List[ConnEntry]] = {}
         
-        # 연결 메타데이터
-        self.connection_metadata: Dict[str, Dict] = {}
+        # 진행 중인 연결 종료 태스크 (GC 로 사라지지 않도록 참조 유지)
+        self._closing: Set[asyncio.Task] = set()
+    
+    def _allocate_slot(self) -> int:
+        """빈 슬롯 번호 반환 (없으면 새 슬롯 추가)"""
+        if self._free_slots:
+            return self._free_slots.pop()
+        self._entries.append(None)
+        
+        slot = len(self._entries) - 1
+        if slot >= len(self._last_activity):
+            self._last_activity = np.concatenate(
+                (self._last_activity, np.full(len(self._last_activity), np.inf))
+            )
+        return slot
     
     async def connect(self, websocket: WebSocket, connection_id: str, session_id: str = None, user_id: int = None):
         """WebSocket 연결 수립"""
         await websocket.accept()
         
         # 연결 저장
-        self.active_connections[connection_id] = websocket
-        
-        # 메타데이터 저장
-        self.connection_metadata[connection_id] = {
-            "session_id": session_id,
-            "user_id": user_id,
-            "connected_at": datetime.now(),
-            "last_activity": datetime.now()
-        }
+        entry = ConnEntry(
+            connection_id,
+            self._allocate_slot(),
+            websocket,
+            session_id,
+            user_id,
+            asyncio.Queue(maxsize=SEND_QUEUE_MAXSIZE)
+        )
+        self.connections[connection_id] = entry
+        self._entries[entry.slot] = entry
+        self._last_activity[entry.slot] = time.monotonic()
+        
+        # 송신 큐를 비우는 writer 태스크 생성
+        entry.writer = asyncio.create_task(
+            self._writer(connection_id, _asgi_send(websocket), entry.queue)
+        )
         
         # 세션별 매핑
         if session_id:
-            if session_id not in self.session_connections:
-                self.session_connections[session_id] = set()
-            self.session_connections[session_id].add(connection_id)
+            self.session_connections.setdefault(session_id, []).append(entry)
         
         # 사용자별 매핑
         if user_id:
-            if user_id not in self.user_connections:
-                self.user_connections[user_id] = set()
-            self.user_connections[user_id].add(connection_id)
+            self.user_connections.setdefault(user_id, []).append(entry)
         
-        print(f"WebSocket connected: {connection_id} (session: {session_id}, user: {user_id})")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("WebSocket connected: %s (session: %s, user: %s)", connection_id, session_id, user_id)
     
     def disconnect(self, connection_id: str):
         """WebSocket 연결 해제"""
-        if connection_id in self.active_connections:
-            # 메타데이터에서 정보 가져오기
-            metadata = self.connection_metadata.get(connection_id, {})
-            session_id = metadata.get("session_id")
-            user_id = metadata.get("user_id")
-            
-            # 연결 제거
-            del self.active_connections[connection_id]
-            
-            # 메타데이터 제거
-            if connection_id in self.connection_metadata:
-                del self.connection_metadata[connection_id]
-            
-            # 세션별 매핑에서 제거
-            if session_id and session_id in self.session_connections:
-                self.session_connections[session_id].discard(connection_id)
-                if not self.session_connections[session_id]:
-                    del self.session_connections[session_id]
-            
-            # 사용자별 매핑에서 제거
-            if user_id and user_id in self.user_connections:
-                self.user_connections[user_id].discard(connection_id)
-                if not self.user_connections[user_id]:
-                    del self.user_connections[user_id]
-            
-            print(f"WebSocket disconnected: {connection_id}")
+        entry = self.connections.pop(connection_id, None)
+        if entry is None:
+            return
+        
+        # 슬롯 비우고 재사용 목록에 반환
+        entry.queue = None
+        self._entries[entry.slot] = None
+        self._last_activity[entry.slot] = np.inf
+        self._free_slots.append(entry.slot)
+        
+        # writer 태스크 취소 (writer 자신이 호출한 경우는 그대로 종료)
+        if entry.writer is not None and entry.writer is not asyncio.current_task():
+            entry.writer.cancel()
+        
+        # 세션별 / 사용자별 매핑에서 제거
+        if entry.session_id:
+            _unindex(self.session_connections, entry.session_id, entry)
+        if entry.user_id:
+            _unindex(self.user_connections, entry.user_id, entry)
+        
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("WebSocket disconnected: %s", connection_id)
     
-    async def send_personal_message(self, message: dict, connection_id: str):
-        """특정 연결에 메시지 전송"""
-        if connection_id in self.active_connections:
+    async def _writer(self, connection_id: str, send: Callable[[dict], Awaitable[None]], queue: asyncio.Queue):
+        """송신 큐에 쌓인 메시지를 한 번에 꺼내 하나의 프레임으로 전송"""
+        while True:
+            batch = [await queue.get()]
+            while len(batch) < MAX_BATCH_MESSAGES:
+                try:
+                    batch.append(queue.get_nowait())
+                except asyncio.QueueEmpty:
+                    break
+            
             try:
-                websocket = self.active_connections[connection_id]
-                await websocket.send_text(json.dumps(message))
-                
-                # 활동 시간 업데이트
-                if connection_id in self.connection_metadata:
-                    self.connection_metadata[connection_id]["last_activity"] = datetime.now()
-                
+                # orjson 이 만든 UTF-8 바이트를 재인코딩 없이 그대로 바이너리 프레임으로 전송
+                for frame in _encode_frames(_coalesce(batch)):
+                    await send({"type": "websocket.send", "bytes": frame})
             except Exception as e:
-                print(f"Failed to send message to {connection_id}: {e}")
+                logger.info("Failed to send message to %s: %s", connection_id, e)
                 self.disconnect(connection_id)
+                return
+    
+    async def send_personal_message(self, message: dict, connection_id: str) -> bool:
+        """특정 연결의 송신 큐에 메시지 추가 (실제 전송은 writer 태스크가 묶어서 수행)
+
+        연결이 이미 끊겼으면 False 반환
+        """
+        return self._enqueue(connection_id, message.get("type"), message)
+    
+    async def send_personal_bytes(self, payload: bytes, connection_id: str, message_type: Optional[str] = None) -> bool:
+        """미리 직렬화된 JSON 바이트를 특정 연결의 송신 큐에 추가 (연결이 끊겼으면 False)"""
+        return self._enqueue(connection_id, message_type, payload)
+    
+    def _enqueue(self, connection_id: str, message_type: Optional[str], payload: Union[dict, bytes]) -> bool:
+        """송신 큐에 항목 추가 및 활동 시간 갱신"""
+        entry = self.connections.get(connection_id)
+        if entry is None:
+            return False
+        return self._enqueue_entry(entry, message_type, payload)
+    
+    def _enqueue_entry(self, entry: ConnEntry, message_type: Optional[str], payload: Union[dict, bytes]) -> bool:
+        """연결 정보로 송신 큐에 항목 추가 (연결 ID 조회 생략)"""
+        queue = entry.queue
+        if queue is None:
+            return False
+        
+        try:
+            queue.put_nowait((message_type, payload))
+        except asyncio.QueueFull:
+            self._drop_slow_client(entry)
+            return False
+        
+        # 활동 시간 업데이트
+        self._last_activity[entry.slot] = time.monotonic()
+        return True
+    
+    def _fanout(self, message: dict, entries: Tuple[ConnEntry, ...]):
+        """한 번 직렬화한 메시지를 여러 연결의 송신 큐에 추가
+
+        entries 는 호출 시점의 스냅샷 (느린 클라이언트 정리가 순회 중에 인덱스를 수정하므로)
+
+        실제 전송은 연결별 writer 태스크가 동시에 수행하므로 느린 클라이언트가
+        다른 연결의 전송을 지연시키지 않고, 실패한 연결은 writer 가 정리함
+        """
+        payload = orjson.dumps(message)
+        message_type = message.get("type")
+        for entry in entries:
+            self._enqueue_entry(entry, message_type, payload)
+    
+    def _drop_slow_client(self, entry: ConnEntry):
+        """송신 큐가 가득 찬 연결 종료 (다른 연결의 전송이나 메모리에 영향을 주지 않도록)"""
+        logger.warning("Send queue full, closing slow client: %s", entry.connection_id)
+        self.disconnect(entry.connection_id)
+        
+        task = asyncio.create_task(_close_quietly(entry.websocket, SLOW_CLIENT_CLOSE_CODE))
+        self._closing.add(task)
+        task.add_done_callback(self._closing.discard)
     
     async def send_to_session(self, message: dict, session_id: str):
         """세션의 모든 연결에 메시지 전송"""
-        if session_id in self.session_connections:
-            connection_ids = list(self.session_connections[session_id])
-            for connection_id in connection_ids:
-                await self.send_personal_message(message, connection_id)
+        entries = self.session_connections.get(session_id)
+        if entries:
+            self._fanout(message, tuple(entries))
     
     async def send_to_user(self, message: dict, user_id: int):
         """사용자의 모든 연결에 메시지 전송"""
-        if user_id in self.user_connections:
-            connection_ids = list(self.user_connections[user_id])
-            for connection_id in connection_ids:
-                await self.send_personal_message(message, connection_id)
+        entries = self.user_connections.get(user_id)
+        if entries:
+            self._fanout(message, tuple(entries))
     
     async def broadcast(self, message: dict):
         """모든 연결에 메시지 브로드캐스트"""
-        connection_ids = list(self.active_connections.keys())
-        for connection_id in connection_ids:
-            await self.send_personal_message(message, connection_id)
+        self._fanout(message, tuple(self.connections.values()))
     
     def get_session_connections(self, session_id: str) -> List[str]:
         """세션의 연결 ID 목록 반환"""
-        return list(self.session_connections.get(session_id, set()))
+        return [entry.connection_id for entry in self.session_connections.get(session_id, ())]
     
     def get_user_connections(self, user_id: int) -> List[str]:
         """사용자의 연결 ID 목록 반환"""
-        return list(self.user_connections.get(user_id, set()))
+        return [entry.connection_id for entry in self.user_connections.get(user_id, ())]
     
     def get_connection_info(self, connection_id: str) -> dict:
         """연결 정보 반환"""
-        return self.connection_metadata.get(connection_id, {})
+        entry = self.connections.get(connection_id)
+        if entry is None:
+            return {}
+        idle_seconds = time.monotonic() - float(self._last_activity[entry.slot])
+        return {
+            "session_id": entry.session_id,
+            "user_id": entry.user_id,
+            "connected_at": entry.connected_at,
+            "last_activity": datetime.now() - timedelta(seconds=idle_seconds)
+        }
     
     def get_stats(self) -> dict:
         """연결 통계 정보 반환"""
         return {
-            "total_connections": len(self.active_connections),
+            "total_connections": len(self.connections),
             "active_sessions": len(self.session_connections),
             "connected_users": len(self.user_connections),
             "connections_by_session": {
@@ -137,21 +349,21 @@ class ConnectionManager:
     
     async def cleanup_inactive_connections(self, timeout_minutes: int = 30):
         """비활성 연결 정리"""
-        current_time = datetime.now()
-        inactive_connections = []
+        cutoff = time.monotonic() - timeout_minutes * 60
         
-        for connection_id, metadata in self.connection_metadata.items():
-            last_activity = metadata.get("last_activity", metadata.get("connected_at"))
-            if (current_time - last_activity).total_seconds() > (timeout_minutes * 60):
-                inactive_connections.append(connection_id)
+        # last_activity 배열을 한 번에 비교해서 오래된 슬롯만 추출 (빈 슬롯은 inf)
+        inactive_connections = [
+            self._entries[slot]
+            for slot in np.flatnonzero(self._last_activity < cutoff)
+        ]
         
-        for connection_id in inactive_connections:
+        for entry in inactive_connections:
             try:
-                if connection_id in self.active_connections:
-                    await self.active_connections[connection_id].close()
-                self.disconnect(connection_id)
+                if entry.queue is not None:
+                    await entry.websocket.close()
+                self.disconnect(entry.connection_id)
             except Exception as e:
-                print(f"Error cleaning up connection {connection_id}: {e}")
+                logger.warning("Error cleaning up connection %s: %s", entry.connection_id, e)
 
 # 전역 연결 관리자 인스턴스
 manager = ConnectionManager()
@@ -164,7 +376,7 @@ async def periodic_cleanup():
             await manager.cleanup_inactive_connections(timeout_minutes=30)
             await asyncio.sleep(300)  # 5분마다 실행
         except Exception as e:
-            print(f"Cleanup error: {e}")
+            logger.exception("Cleanup error: %s", e)
             await asyncio.sleep(60)  # 오류 발생 시 1분 후 재시도
 
 # 백그라운드 태스크로 정리 작업 시작
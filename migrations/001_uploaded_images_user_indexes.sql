@@ -0,0 +1,6 @@
+-- 사용자별 최신순 이미지 목록 조회용 복합 인덱스 (app/models/camera.py UploadedImage.__table_args__)
+-- 사용자+세션별 목록: WHERE user_id = ? AND session_id = ? ORDER BY uploaded_at DESC
+CREATE INDEX ix_uimg_user_session_uploaded ON uploaded_images (user_id, session_id, uploaded_at);
+
+-- 세션 필터 없는 사용자별 목록: WHERE user_id = ? ORDER BY uploaded_at DESC
+CREATE INDEX ix_uimg_user_uploaded ON uploaded_images (user_id, uploaded_at);
@@ -0,0 +1,3 @@
+-- 업로드 시 생성된 썸네일 상대 경로 (app/models/camera.py UploadedImage.thumbnail_path)
+-- 기존 행은 NULL 로 남으며, 조회/삭제 시 thumb_<파일명> 규칙으로 경로를 계산함
+ALTER TABLE uploaded_images ADD COLUMN thumbnail_path VARCHAR(500) NULL AFTER mime_type;
@@ -0,0 +1,6 @@
+-- 업로드 원본 내용 SHA-256 (hex) 와 중복 확인용 인덱스 (app/models/camera.py UploadedImage.content_hash)
+-- 같은 사용자/세션에 같은 내용이 다시 업로드되면 새로 저장하지 않고 기존 이미지를 반환함
+-- 기존 행은 NULL 로 남으며 중복 확인 대상에서 제외됨
+ALTER TABLE uploaded_images ADD COLUMN content_hash VARCHAR(64) NULL AFTER thumbnail_path;
+
+CREATE INDEX ix_uimg_content_hash ON uploaded_images (content_hash);
@@ -0,0 +1,10 @@
+-- 세션/이미지 타임스탬프를 DB 에서 생성 (app/models/camera.py server_default=func.now())
+-- INSERT 시 값을 보내지 않으므로 기본값이 없으면 NULL 로 저장됨
+-- CURRENT_TIMESTAMP 는 세션 time_zone 기준이며, 앱 커넥션은 time_zone 을 '+00:00' 으로 설정해 UTC 로 기록됨
+-- updated_at 의 갱신은 ORM 의 onupdate=func.now() 가 UPDATE 문에 포함시킴
+ALTER TABLE camera_sessions
+    MODIFY COLUMN created_at DATETIME NULL DEFAULT CURRENT_TIMESTAMP,
+    MODIFY COLUMN updated_at DATETIME NULL DEFAULT CURRENT_TIMESTAMP;
+
+ALTER TABLE uploaded_images
+    MODIFY COLUMN uploaded_at DATETIME NULL DEFAULT CURRENT_TIMESTAMP;
@@ -0,0 +1,9 @@
+-- 세션/이미지 조회용 복합 인덱스 (app/models/camera.py CameraSession/UploadedImage.__table_args__)
+-- 사용자별 활성 세션 조회 / 상태별 통계: WHERE user_id = ? AND status = ? ORDER BY created_at
+CREATE INDEX ix_sessions_user_status_created ON camera_sessions (user_id, status, created_at);
+
+-- 사용자별 최신순 세션 목록: WHERE user_id = ? ORDER BY created_at DESC
+CREATE INDEX ix_sessions_user_created ON camera_sessions (user_id, created_at);
+
+-- 세션 상세 조회 시 이미지 일괄 로딩: WHERE session_id IN (...) ORDER BY uploaded_at DESC
+CREATE INDEX ix_uimg_session_uploaded ON uploaded_images (session_id, uploaded_at);
@@ -2,14 +2,28 @@
 """
 Camera Backend 실행 스크립트
 """
+import sys
 import uvicorn
 from app.config.settings import settings
 
-if __name__ == "__main__":
+def main():
+    """uvicorn 서버 실행 (app.main 직접 실행 시에도 이 설정을 사용)"""
     uvicorn.run(
         "app.main:app",
         host=settings.HOST,
         port=settings.PORT,
+        # uvloop 은 Windows 를 지원하지 않으므로 기본 asyncio 루프 사용
+        loop="asyncio" if sys.platform == "win32" else "uvloop",
+        http="httptools",
+        ws="websockets",
+        # reload 모드에서는 workers 설정이 무시됨 (개발 환경 전용)
+        workers=settings.UVICORN_WORKERS,
         reload=settings.DEBUG,
+        ws_max_size=settings.WS_MAX_SIZE,
+        ws_ping_interval=settings.WS_PING_INTERVAL,
+        ws_per_message_deflate=settings.WS_PER_MESSAGE_DEFLATE,
         log_level="info"
     )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+import asyncio
+import threading
+
+import pytest
+
+from app.core.async_batcher import AsyncBatcher
+
+
+def test_concurrent_submits_are_processed_as_one_batch():
+    batches = []
+
+    def process(items):
+        batches.append(list(items))
+        return [item * 10 for item in items]
+
+    async def main():
+        batcher = AsyncBatcher(process, max_batch=8, max_wait_ms=50)
+        try:
+            return await asyncio.gather(*(batcher.submit(i) for i in range(5)))
+        finally:
+            batcher.close()
+
+    assert asyncio.run(main()) == [0, 10, 20, 30, 40]
+    assert batches == [[0, 1, 2, 3, 4]]
+
+
+def test_batches_are_capped_at_max_batch():
+    batches = []
+
+    def process(items):
+        batches.append(list(items))
+        return items
+
+    async def main():
+        batcher = AsyncBatcher(process, max_batch=3, max_wait_ms=50)
+        try:
+            return await asyncio.gather(*(batcher.submit(i) for i in range(7)))
+        finally:
+            batcher.close()
+
+    assert asyncio.run(main()) == list(range(7))
+    assert [len(batch) for batch in batches] == [3, 3, 1]
+
+
+def test_batch_exception_is_propagated_to_every_caller():
+    def process(items):
+        raise ValueError("boom")
+
+    async def main():
+        batcher = AsyncBatcher(process, max_wait_ms=50)
+        try:
+            return await asyncio.gather(
+                *(batcher.submit(i) for i in range(3)), return_exceptions=True
+            )
+        finally:
+            batcher.close()
+
+    results = asyncio.run(main())
+    assert all(isinstance(result, ValueError) for result in results)
+
+
+def test_cancelled_caller_does_not_break_the_batch():
+    started = threading.Event()
+    release = threading.Event()
+
+    def process(items):
+        started.set()
+        release.wait(5)
+        return [item + 1 for item in items]
+
+    async def main():
+        batcher = AsyncBatcher(process, max_wait_ms=50)
+        try:
+            cancelled = asyncio.create_task(batcher.submit(1))
+            kept = asyncio.create_task(batcher.submit(2))
+            await asyncio.get_running_loop().run_in_executor(None, started.wait, 5)
+
+            # 배치 처리 중에 연결이 끊긴 요청을 취소해도 나머지 요청은 결과를 받음
+            cancelled.cancel()
+            release.set()
+
+            with pytest.raises(asyncio.CancelledError):
+                await cancelled
+            result = await kept
+
+            # 슬롯이 반환되어 다음 요청도 정상 처리
+            return result, await batcher.submit(3)
+        finally:
+            batcher.close()
+
+    assert asyncio.run(main()) == (3, 4)
+
+
+def test_close_cancels_worker():
+    def process(items):
+        return items
+
+    async def main():
+        batcher = AsyncBatcher(process, max_wait_ms=1)
+        await batcher.submit("a")
+        worker = batcher.worker
+
+        batcher.close()
+        await asyncio.sleep(0)
+        assert batcher.worker is None
+        assert worker.cancelled()
+
+    asyncio.run(main())
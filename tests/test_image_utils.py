@@ -0,0 +1,99 @@
+import io
+import os
+import re
+
+import pytest
+from PIL import Image
+
+from app.utils import image_utils
+from app.utils.image_utils import sanitize_filename, validate_image_file
+
+
+def encode(format_name: str) -> bytes:
+    buffer = io.BytesIO()
+    Image.new("RGB", (8, 8), (200, 120, 80)).save(buffer, format=format_name)
+    return buffer.getvalue()
+
+
+@pytest.mark.parametrize("format_name", ["JPEG", "PNG", "GIF", "BMP", "TIFF", "WEBP"])
+def test_sniff_accepts_encoded_images(format_name):
+    assert image_utils._sniff_image(encode(format_name)[:32])
+
+
+@pytest.mark.parametrize("brand", sorted(image_utils.HEIF_BRANDS))
+def test_sniff_accepts_heif_brands(brand):
+    header = b"\x00\x00\x00\x18ftyp" + brand + b"\x00\x00\x00\x00mif1heic"
+    assert image_utils._sniff_image(header)
+
+
+@pytest.mark.parametrize("header", [
+    b"",
+    b"%PDF-1.7\n",
+    b"PK\x03\x04" + b"\x00" * 28,
+    b"RIFF\x24\x00\x00\x00WAVEfmt ",
+    b"\x00\x00\x00\x18ftypisom\x00\x00\x02\x00",
+    b"<html><body>",
+])
+def test_sniff_rejects_non_images(header):
+    assert not image_utils._sniff_image(header)
+
+
+def test_validate_checks_signature_only_by_default(tmp_path):
+    image_path = tmp_path / "face.jpg"
+    image_path.write_bytes(encode("JPEG"))
+    text_path = tmp_path / "face.txt"
+    text_path.write_bytes(b"not an image")
+
+    assert validate_image_file(str(image_path))
+    assert not validate_image_file(str(text_path))
+    assert not validate_image_file(str(tmp_path / "missing.jpg"))
+
+
+def test_validate_deep_rejects_corrupt_image_with_valid_signature(tmp_path):
+    # 시그니처만 맞고 본문이 깨진 파일은 deep=True 일 때만 걸러짐
+    path = tmp_path / "broken.png"
+    path.write_bytes(b"\x89PNG\r\n\x1a\n" + b"\x00" * 64)
+
+    assert validate_image_file(str(path))
+    assert not validate_image_file(str(path), deep=True)
+
+
+def test_validate_deep_accepts_valid_image(tmp_path):
+    path = tmp_path / "face.png"
+    path.write_bytes(encode("PNG"))
+
+    assert validate_image_file(str(path), deep=True)
+
+
+def legacy_sanitize_filename(filename: str) -> str:
+    """translate 적용 전의 정규식 구현 (동작 비교용)"""
+    safe_filename = re.sub(r'[^\w\-_\.]', '_', filename)
+    name, ext = os.path.splitext(safe_filename)
+    if len(name) > 100:
+        name = name[:100]
+    return f"{name}{ext}"
+
+
+def test_sanitize_matches_regex_for_every_ascii_char():
+    for code in range(128):
+        filename = f"a{chr(code)}b.jpg"
+        assert sanitize_filename(filename) == legacy_sanitize_filename(filename), repr(filename)
+
+
+@pytest.mark.parametrize("filename", [
+    "photo.jpg",
+    "my photo (1).JPEG",
+    "../../etc/passwd",
+    "C:\\Users\\me\\face.png",
+    "셀카 사진.jpg",
+    "café_ünïcode.png",
+    "emoji😀face.heic",
+    "탭\t줄바꿈\n.jpg",
+    ".hidden",
+    "no_extension",
+    "a" * 150 + ".jpg",
+    "가" * 150 + ".png",
+    "",
+])
+def test_sanitize_matches_regex_implementation(filename):
+    assert sanitize_filename(filename) == legacy_sanitize_filename(filename)
@@ -0,0 +1,65 @@
+import time
+
+import jwt
+import pytest
+from fastapi import HTTPException
+
+from app.config.settings import settings
+from app.core import security
+from app.core.security import JWTHandler
+
+
+def make_token(exp: float, sub: str = "42") -> str:
+    return jwt.encode(
+        {"sub": sub, "email": "user@example.com", "exp": int(exp)},
+        settings.JWT_SECRET,
+        algorithm=settings.JWT_ALGORITHM
+    )
+
+
+@pytest.fixture
+def handler():
+    security._TOKEN_CACHE.clear()
+    handler = JWTHandler()
+    yield handler
+    security._TOKEN_CACHE.clear()
+
+
+def test_cached_token_skips_decoding(handler, monkeypatch):
+    token = make_token(time.time() + 3600)
+    assert handler.verify_token(token)["id"] == 42
+
+    def fail_decode(token):
+        raise AssertionError("cached token was decoded again")
+
+    monkeypatch.setattr(handler, "decode_token", fail_decode)
+    assert handler.verify_token(token)["id"] == 42
+
+
+def test_cached_token_is_rejected_once_expired(handler):
+    exp = time.time() + 60
+    token = make_token(exp)
+    handler.verify_token(token)
+
+    # 캐시 TTL 안이라도 토큰의 exp 가 지나면 캐시 항목을 쓰지 않고 다시 검증
+    handler._now = lambda: exp + 1
+    with pytest.raises(HTTPException) as exc_info:
+        handler.verify_token(token)
+
+    assert exc_info.value.status_code == 401
+    assert exc_info.value.detail == "Token expired"
+
+
+def test_cache_is_keyed_by_token_digest(handler):
+    token = make_token(time.time() + 3600)
+    handler.verify_token(token)
+
+    assert token not in security._TOKEN_CACHE
+    assert security._token_cache_key(token) in security._TOKEN_CACHE
+
+
+def test_invalid_token_is_not_cached(handler):
+    with pytest.raises(HTTPException):
+        handler.verify_token("not-a-jwt")
+
+    assert len(security._TOKEN_CACHE) == 0
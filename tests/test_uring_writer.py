@@ -0,0 +1,168 @@
+import errno
+import io
+import os
+import threading
+from collections import deque
+
+import pytest
+
+from app.core import uring_writer
+
+
+class FakeSQE:
+    def __init__(self):
+        self.op = None
+        self.user_data = 0
+
+
+class FakeCQE:
+    def __init__(self, res: int, user_data: int):
+        self.res = res
+        self.user_data = user_data
+
+
+class FakeRing:
+    def __init__(self):
+        self.sq = []
+        self.cq = deque()
+
+
+class FakeLiburing:
+    """liburing 대역 (제출 시 실제 pwrite/fsync/unlink 수행, 완료는 역순으로 전달)
+
+    max_write 를 지정하면 쓰기 한 번에 그 바이트 수까지만 기록 (부분 쓰기 재현)
+    """
+    AT_FDCWD = -100
+
+    def __init__(self, max_write=None):
+        self.max_write = max_write
+        self.submissions = []
+        self.rings = []
+        self.exited = []
+
+    def io_uring(self):
+        ring = FakeRing()
+        self.rings.append(ring)
+        return ring
+
+    def io_uring_cqes(self):
+        return [None]
+
+    def io_uring_queue_init(self, depth, ring, flags):
+        ring.depth = depth
+
+    def io_uring_queue_exit(self, ring):
+        self.exited.append(ring)
+
+    def io_uring_get_sqe(self, ring):
+        assert len(ring.sq) < ring.depth
+        sqe = FakeSQE()
+        ring.sq.append(sqe)
+        return sqe
+
+    def io_uring_prep_write(self, sqe, fd, data, length, offset):
+        sqe.op = ("write", fd, data, length, offset)
+
+    def io_uring_prep_fsync(self, sqe, fd, flags):
+        sqe.op = ("fsync", fd)
+
+    def io_uring_prep_unlinkat(self, sqe, dfd, path, flags):
+        sqe.op = ("unlink", path)
+
+    def io_uring_submit(self, ring):
+        batch, ring.sq = ring.sq, []
+        self.submissions.append([sqe.op for sqe in batch])
+
+        completions = []
+        for sqe in batch:
+            kind = sqe.op[0]
+            if kind == "write":
+                _, fd, data, length, offset = sqe.op
+                size = length if self.max_write is None else min(length, self.max_write)
+                res = os.pwrite(fd, data[:size], offset)
+            elif kind == "fsync":
+                os.fsync(sqe.op[1])
+                res = 0
+            else:
+                try:
+                    os.unlink(sqe.op[1])
+                    res = 0
+                except FileNotFoundError:
+                    res = -errno.ENOENT
+            completions.append(FakeCQE(res, sqe.user_data))
+
+        # 완료 순서가 제출 순서와 다를 수 있으므로 역순으로 전달
+        ring.cq.extend(reversed(completions))
+
+    def io_uring_wait_cqe(self, ring, cqes):
+        cqes[0] = ring.cq.popleft()
+
+    def io_uring_cqe_seen(self, ring, cqe):
+        pass
+
+
+@pytest.fixture
+def fake_uring(monkeypatch):
+    def install(**kwargs):
+        fake = FakeLiburing(**kwargs)
+        monkeypatch.setattr(uring_writer, "liburing", fake)
+        monkeypatch.setattr(uring_writer, "_local", threading.local())
+        return fake
+    return install
+
+
+def test_short_writes_are_resubmitted_from_where_they_stopped(fake_uring, tmp_path):
+    fake = fake_uring(max_write=100_000)
+    data = os.urandom(uring_writer.CHUNK_SIZE * 2 + 12_345)
+    path = tmp_path / "upload.jpg"
+
+    written = uring_writer._write_with_uring(str(path), io.BytesIO(data))
+
+    assert written == len(data)
+    assert path.read_bytes() == data
+
+    # 첫 제출은 청크 3개, 재제출은 다 쓰지 못한 두 청크를 이어서 쓸 위치부터 (마지막 청크는 한 번에 완료)
+    first, second = fake.submissions[0], fake.submissions[1]
+    assert [op[4] for op in first] == [0, uring_writer.CHUNK_SIZE, uring_writer.CHUNK_SIZE * 2]
+    assert sorted(op[4] for op in second) == [100_000, uring_writer.CHUNK_SIZE + 100_000]
+    assert all(op[3] == uring_writer.CHUNK_SIZE - 100_000 for op in second)
+    assert fake.submissions[-1][0][0] == "fsync"
+
+
+def test_zero_byte_write_raises_after_reaping_and_discards_ring(fake_uring, tmp_path):
+    fake = fake_uring(max_write=0)
+    data = os.urandom(uring_writer.CHUNK_SIZE * 2)
+
+    with pytest.raises(OSError) as exc_info:
+        uring_writer._write_with_uring(str(tmp_path / "upload.jpg"), io.BytesIO(data))
+
+    assert exc_info.value.errno == errno.EIO
+    # 실패한 배치의 CQE 는 모두 수거된 뒤 링이 해제됨
+    ring = fake.rings[0]
+    assert not ring.cq
+    assert fake.exited == [ring]
+
+
+def test_ring_is_reused_across_writes(fake_uring, tmp_path):
+    fake = fake_uring()
+
+    for name in ("a.jpg", "b.jpg"):
+        uring_writer._write_with_uring(str(tmp_path / name), io.BytesIO(b"x" * 1000))
+
+    assert len(fake.rings) == 1
+    assert fake.exited == []
+
+
+def test_unlink_batches_by_queue_depth_and_ignores_missing_files(fake_uring, tmp_path):
+    fake = fake_uring()
+    paths = []
+    for i in range(uring_writer.QUEUE_DEPTH + 5):
+        path = tmp_path / f"{i}.jpg"
+        path.write_bytes(b"x")
+        paths.append(str(path))
+    paths.append(str(tmp_path / "missing.jpg"))
+
+    uring_writer._unlink_with_uring(paths)
+
+    assert not any(os.path.exists(path) for path in paths)
+    assert [len(batch) for batch in fake.submissions] == [uring_writer.QUEUE_DEPTH, 6]
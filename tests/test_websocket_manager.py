@@ -0,0 +1,210 @@
+import asyncio
+
+import orjson
+
+from app.websocket import manager as ws_manager
+from app.websocket.manager import ConnectionManager
+
+
+class FakeWebSocket:
+    """accept/close 와 ASGI send 만 흉내 내는 WebSocket 대역 (전송된 프레임을 기록)"""
+
+    def __init__(self):
+        self.frames = []
+        self.closed_with = None
+
+    async def accept(self):
+        pass
+
+    async def _send(self, message: dict):
+        self.frames.append(message["bytes"])
+
+    async def close(self, code: int = 1000):
+        self.closed_with = code
+
+
+async def flush():
+    """writer 태스크가 송신 큐를 비울 때까지 이벤트 루프에 양보"""
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+def test_queued_messages_are_sent_in_one_batch_envelope():
+    async def main():
+        manager = ConnectionManager()
+        websocket = FakeWebSocket()
+        await manager.connect(websocket, "conn", session_id="s1")
+
+        for i in range(3):
+            await manager.send_personal_message({"type": "face_detection", "seq": i}, "conn")
+        await flush()
+
+        manager.disconnect("conn")
+        return websocket.frames
+
+    frames = asyncio.run(main())
+    assert len(frames) == 1
+    assert frames[0].startswith(ws_manager.BATCH_PREFIX)
+    assert orjson.loads(frames[0]) == {
+        "type": "batch",
+        "msgs": [{"type": "face_detection", "seq": i} for i in range(3)]
+    }
+
+
+def test_single_message_is_sent_without_envelope():
+    async def main():
+        manager = ConnectionManager()
+        websocket = FakeWebSocket()
+        await manager.connect(websocket, "conn")
+
+        await manager.send_personal_bytes(b'{"type":"pong"}', "conn", "pong")
+        await flush()
+
+        manager.disconnect("conn")
+        return websocket.frames
+
+    assert asyncio.run(main()) == [b'{"type":"pong"}']
+
+
+def test_countdown_ticks_are_coalesced_to_the_last_value():
+    async def main():
+        manager = ConnectionManager()
+        websocket = FakeWebSocket()
+        await manager.connect(websocket, "conn")
+
+        await manager.send_personal_message({"type": "countdown_tick", "value": 3}, "conn")
+        await manager.send_personal_message({"type": "face_detection", "seq": 0}, "conn")
+        await manager.send_personal_message({"type": "countdown_tick", "value": 2}, "conn")
+        await manager.send_personal_message({"type": "countdown_tick", "value": 1}, "conn")
+        await flush()
+
+        manager.disconnect("conn")
+        return websocket.frames
+
+    frames = asyncio.run(main())
+    # 카운트다운 틱은 마지막 값만 남고, 다른 메시지의 순서는 유지됨
+    assert orjson.loads(frames[0])["msgs"] == [
+        {"type": "face_detection", "seq": 0},
+        {"type": "countdown_tick", "value": 1}
+    ]
+
+
+def test_fanout_serializes_once_for_every_session_connection():
+    async def main():
+        manager = ConnectionManager()
+        sockets = [FakeWebSocket(), FakeWebSocket()]
+        for i, websocket in enumerate(sockets):
+            await manager.connect(websocket, f"conn{i}", session_id="s1")
+
+        await manager.send_to_session({"type": "capture_complete"}, "s1")
+        await flush()
+
+        for i in range(len(sockets)):
+            manager.disconnect(f"conn{i}")
+        return [websocket.frames for websocket in sockets]
+
+    assert asyncio.run(main()) == [[b'{"type":"capture_complete"}']] * 2
+
+
+def test_batch_is_split_into_frames_under_max_batch_bytes():
+    payload = b'{"type":"face_detection","pad":"' + b"x" * 30_000 + b'"}'
+
+    async def main():
+        manager = ConnectionManager()
+        websocket = FakeWebSocket()
+        await manager.connect(websocket, "conn")
+
+        for _ in range(5):
+            await manager.send_personal_bytes(payload, "conn", "face_detection")
+        await flush()
+
+        manager.disconnect("conn")
+        return websocket.frames
+
+    frames = asyncio.run(main())
+    # 30KB 메시지 5개는 64KB 제한에 맞춰 2개, 2개, 1개로 나뉨 (마지막 1개는 봉투 없이 단독 전송)
+    assert [len(orjson.loads(frame).get("msgs", [None])) for frame in frames] == [2, 2, 1]
+    assert all(len(frame) <= ws_manager.MAX_BATCH_BYTES for frame in frames)
+    assert frames[-1] == payload
+
+
+def test_oversized_message_is_sent_as_its_own_frame():
+    small = b'{"type":"pong"}'
+    large = b'{"type":"face_detection","pad":"' + b"x" * ws_manager.MAX_BATCH_BYTES + b'"}'
+
+    frames = ws_manager._encode_frames([("pong", small), ("face_detection", large), ("pong", small)])
+
+    assert frames == [small, large, small]
+
+
+def test_writer_caps_messages_per_frame():
+    async def main():
+        manager = ConnectionManager()
+        websocket = FakeWebSocket()
+        await manager.connect(websocket, "conn")
+
+        for i in range(ws_manager.MAX_BATCH_MESSAGES + 1):
+            await manager.send_personal_message({"type": "face_detection", "seq": i}, "conn")
+        await flush()
+
+        manager.disconnect("conn")
+        return websocket.frames
+
+    frames = asyncio.run(main())
+    assert len(orjson.loads(frames[0])["msgs"]) == ws_manager.MAX_BATCH_MESSAGES
+    assert orjson.loads(frames[1]) == {"type": "face_detection", "seq": ws_manager.MAX_BATCH_MESSAGES}
+
+
+def test_slow_client_is_dropped_when_send_queue_overflows(monkeypatch):
+    monkeypatch.setattr(ws_manager, "SEND_QUEUE_MAXSIZE", 4)
+
+    async def main():
+        manager = ConnectionManager()
+        slow, fast = FakeWebSocket(), FakeWebSocket()
+        await manager.connect(slow, "slow", session_id="s1")
+        await manager.connect(fast, "fast", session_id="s1")
+
+        # writer 가 큐를 비우기 전에 큐 크기를 넘는 메시지가 쌓이면 느린 클라이언트로 보고 종료
+        for i in range(4):
+            assert await manager.send_personal_message({"type": "face_detection", "seq": i}, "slow")
+        assert not await manager.send_personal_message({"type": "face_detection", "seq": 4}, "slow")
+
+        await manager.send_to_session({"type": "capture_complete"}, "s1")
+        await flush()
+
+        result = (
+            list(manager.connections),
+            manager.get_session_connections("s1"),
+            slow.closed_with,
+            fast.frames
+        )
+        manager.disconnect("fast")
+        return result
+
+    connections, session_connections, close_code, fast_frames = asyncio.run(main())
+    assert connections == ["fast"]
+    assert session_connections == ["fast"]
+    assert close_code == ws_manager.SLOW_CLIENT_CLOSE_CODE
+    # 다른 연결의 전송에는 영향 없음
+    assert fast_frames == [b'{"type":"capture_complete"}']
+
+
+def test_dropped_slot_is_reused_by_next_connection(monkeypatch):
+    monkeypatch.setattr(ws_manager, "SEND_QUEUE_MAXSIZE", 1)
+
+    async def main():
+        manager = ConnectionManager()
+        await manager.connect(FakeWebSocket(), "slow")
+        slot = manager.connections["slow"].slot
+
+        await manager.send_personal_message({"type": "face_detection"}, "slow")
+        await manager.send_personal_message({"type": "face_detection"}, "slow")
+        await flush()
+
+        await manager.connect(FakeWebSocket(), "next")
+        result = manager.connections["next"].slot
+        manager.disconnect("next")
+        return slot, result
+
+    slot, reused = asyncio.run(main())
+    assert reused == slot